@@ -1,5 +1,6 @@
 import os
-from typing import Callable, Dict, Any
+from functools import lru_cache
+from typing import Callable, Dict, Any, Mapping
 
 from pyocle.service.kms import KeyManagementService, DecryptForm
 
@@ -16,17 +17,25 @@ class MissingEnvironmentVariableError(Exception):
         return f'An environment variable with the name: {self.env_var_name} could not be found.'
 
 
+# Prefix marking environment variables that should be treated as plaintext rather than cipher text.
+_PLAINTEXT_PREFIX = os.environ.get('PYOCLE_PLAINTEXT_PREFIX', 'plain:')
+
+# Sentinel used to detect missing environment variables without raising and catching a KeyError.
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
 def connection_string(default=None) -> str:
     """
     Retrieves the environment's connection string cipher text and decrypts with Key Management Service to
-    connection string plain text
+    connection string plain text. The result is cached after the first successful retrieval.
 
     :return: Environment connection string plain text.
     """
     return encrypted_env_var('CONNECTION_STRING', default=default)
 
 
-def env_var(name: str, default: str = None, environment=os.environ) -> str:
+def env_var(name: str, default: str = None, environment: Mapping[str, str] = None) -> str:
     """
     Retrieves a specified environment variable.
     A default value can be provided in the case the value could not be found.
@@ -37,23 +46,54 @@ def env_var(name: str, default: str = None, environment=os.environ) -> str:
     :param environment: The environment to attempt to retrieve the variable from. By default the os environment is used.
     :return:
     """
-    try:
-        return environment[name]
-    except KeyError:
+    value = (os.environ if environment is None else environment).get(name, _MISSING)
+
+    if value is _MISSING:
         if default is None:
             raise MissingEnvironmentVariableError(name)
         return default
 
+    return value
+
+
+# Lazily constructed key management service shared by all decrypt operations within this module.
+_kms_client = None
+
+
+def _kms_service() -> KeyManagementService:
+    """
+    Retrieves the key management service used to decrypt environment variables.
+    The service is only constructed the first time it is needed and reused afterwards.
+
+    :return: The shared key management service
+    """
+    global _kms_client
+    if _kms_client is None:
+        _kms_client = KeyManagementService()
+
+    return _kms_client
+
+
+def warmup_kms() -> None:
+    """
+    Constructs the key management service used to decrypt environment variables ahead of time.
+    Intended to be called while a lambda is initializing so that the first request does not pay the client
+    construction cost.
+    """
+    _kms_service()
+
 
+@lru_cache(maxsize=128)
 def _kms_decrypter(value: str) -> str:
     """
     Helper function used decrypt an encrypted value with key management service.
+    Decrypted values are cached by cipher text so that repeated lookups do not result in additional KMS calls.
 
     :param value: The value to decrypt
     :return: The decrypted value
     """
     form = DecryptForm(cipher_text_blob=value)
-    response = KeyManagementService().decrypt(form)
+    response = _kms_service().decrypt(form)
 
     # plaintext comes back in the form of bytes. Need to decode to utf-8
     return response['Plaintext'].decode('utf-8')
@@ -63,11 +103,13 @@ def encrypted_env_var(name: str,
                       default: str = None,
                       decrypter: Callable[[str, Dict[str, Any]], str] = _kms_decrypter,
                       attrs: Dict[str, Any] = None,
-                      environment=os.environ) -> str:
+                      environment: Mapping[str, str] = None) -> str:
     """
     Retrieves a specified encrypted environment variable and decrypts the value.
     A default value can be provided in the case the value could not be found.
     Otherwise an exception is raised detailing that the variable could not be retrieved.
+    Values starting with the plaintext prefix (PYOCLE_PLAINTEXT_PREFIX, 'plain:' by default) are returned without
+    the prefix and are not decrypted.
 
     :param name: The name of the environment variable to retrieve
     :param default: The value that will be returned if no environment variable could be found.
@@ -81,9 +123,14 @@ def encrypted_env_var(name: str,
 
     try:
         environment_variable = env_var(name, environment=environment)
-        return decrypter(environment_variable, **attrs)
     except MissingEnvironmentVariableError as ex:
         if default is None:
             raise ex
 
         return default
+
+    # Values that are not actually encrypted (local development) skip decryption entirely
+    if _PLAINTEXT_PREFIX and environment_variable.startswith(_PLAINTEXT_PREFIX):
+        return environment_variable[len(_PLAINTEXT_PREFIX):]
+
+    return decrypter(environment_variable, **attrs)
@@ -1,6 +1,7 @@
-from typing import Sequence, Union, Dict, Any, Type, TypeVar, Optional
+import json
+from functools import lru_cache
+from typing import Sequence, Union, Dict, Any, Type, TypeVar, Optional, FrozenSet, Tuple
 
-import jsonpickle
 from pydantic import ValidationError, BaseModel, conint
 
 
@@ -44,22 +45,42 @@ def resolve_form(data: Union[str, bytes, Dict[str, Any]], form_type: Type[T]) ->
     :param form_type: The form type to resolve
     :return: The resolved form
     """
+    form, error = try_resolve_form(data, form_type)
+    if error is not None:
+        raise error
 
-    # All validation is built around pydantic. For extra guard rails, lets make sure the type given is a subclass of
-    # pydantic's BaseModel otherwise it just doesnt make sense.
-    if not issubclass(form_type, BaseModel):
-        raise ValueError(f'Unsupported form type: {form_type.__name__}. Type must be subclass of pydantic.BaseModel')
+    return form
+
+
+def try_resolve_form(data: Union[str, bytes, Dict[str, Any]],
+                     form_type: Type[T]) -> Tuple[Optional[T], Optional[FormValidationError]]:
+    """
+    Same as resolve_form except validation errors are returned instead of raised. Useful on hot paths where
+    invalid forms are common and raising exceptions is not wanted.
+
+    Ex.
+    form, error = try_resolve_form(app.current_request.raw_body, MyForm)
+    if error is not None:
+        return bad(error_details=..., schemas=error.schemas)
+
+    :param data: The json that will be used to build the form. This data can be given in
+     the form of string, bytes or dictionary.
+    :param form_type: The form type to resolve
+    :return: The resolved form and None, or None and the error describing why the form was invalid
+    """
+
+    _ensure_model(form_type)
 
     try:
         if isinstance(data, (str, bytes)):
-            data = jsonpickle.loads(data)
+            data = json.loads(data)
 
-        return form_type(**data)
+        return form_type(**data), None
     except ValidationError as ex:
         schema_name = _resolve_schema_name(form_type)
-        raise FormValidationError(errors=ex.errors(), schemas={schema_name: form_type.schema()})
+        return None, FormValidationError(errors=ex.errors(), schemas={schema_name: _schema(form_type)})
     except (TypeError, ValueError) as ex:
-        # Will be raised by the jsonpickle.loads call when incoming str or bytes are not valid JSON.
+        # Will be raised by the json.loads call when incoming str or bytes are not valid JSON.
         errors = [
             {
                 'loc': ['requestBody'],
@@ -67,11 +88,13 @@ def resolve_form(data: Union[str, bytes, Dict[str, Any]], form_type: Type[T]) ->
             }
         ]
         schema_name = _resolve_schema_name(form_type)
-        raise FormValidationError(
+        error = FormValidationError(
             message='Form could not be validated due to given json not existing or being valid',
             errors=errors,
-            schemas={schema_name: form_type.schema()}
-        ) from ex
+            schemas={schema_name: _schema(form_type)}
+        )
+        error.__cause__ = ex
+        return None, error
 
 
 def resolve_query_params(params: Optional[Dict[str, str]], model: Type[BaseModel]) -> T:
@@ -83,10 +106,66 @@ def resolve_query_params(params: Optional[Dict[str, str]], model: Type[BaseModel
     :param model: The model the query parameters should be mapped to
     :return: The resolved query parameter model
     """
-    query_param_dict = {} if params is None else resolve_form(params, model).dict(exclude_none=True)
+    try:
+        key = frozenset((params or {}).items())
+    except TypeError:
+        # Unhashable parameter values can not be cached and are resolved directly
+        return _resolve_query_params(params, model)
+
+    # Copy so callers can not modify the cached instance
+    return _cached_query_params(key, model).copy()
+
+
+@lru_cache(maxsize=256)
+def _cached_query_params(params: FrozenSet[Tuple[str, Any]], model: Type[BaseModel]) -> T:
+    """
+    Cached variant of _resolve_query_params. Query parameters usually have a small amount of possible values
+    such as pagination parameters, so resolved models are cached by their parameters.
+
+    :param params: The query parameter items that should be resolved
+    :param model: The model the query parameters should be mapped to
+    :return: The resolved query parameter model
+    """
+    return _resolve_query_params(dict(params), model)
+
+
+def _resolve_query_params(params: Dict[str, Any], model: Type[BaseModel]) -> T:
+    """
+    :param params: The dictionary of query parameters that should be resolved to
+    :param model: The model the query parameters should be mapped to
+    :return: The resolved query parameter model
+    """
+    query_param_dict = resolve_form(params, model).dict(exclude_none=True)
     return model(**query_param_dict)
 
 
+@lru_cache(maxsize=256)
+def _ensure_model(form_type: type) -> None:
+    """
+    Ensures the given form type is supported. Accepted types are cached so the check is only performed once per type.
+
+    :param form_type: The form type to check
+    """
+
+    # All validation is built around pydantic. For extra guard rails, lets make sure the type given is a subclass of
+    # pydantic's BaseModel otherwise it just doesnt make sense.
+    if not issubclass(form_type, BaseModel):
+        raise ValueError(f'Unsupported form type: {form_type.__name__}. Type must be subclass of pydantic.BaseModel')
+
+
+@lru_cache(maxsize=None)
+def _schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Builds the schema of the given model. Schema generation is expensive with pydantic and the result never changes
+    for a given model, so schemas are cached per model.
+
+    :param model: The model to build the schema for
+    :return: The model's schema
+    """
+    return model.schema()
+
+
+@lru_cache(maxsize=None)
 def _resolve_schema_name(model: Type[BaseModel]) -> str:
     """
     Hacky function to determine a schema name based on the model type. This should be updated to something more
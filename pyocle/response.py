@@ -1,52 +1,64 @@
 import logging
-from typing import Any, Union, Sequence, Optional, Dict, List
-
-import jsonpickle
+import sys
+from base64 import b64encode
+from dataclasses import dataclass, fields, is_dataclass
+from decimal import Decimal
+from functools import lru_cache, wraps
+from operator import itemgetter
+from typing import Any, Union, Sequence, Optional, Dict, List, Callable
+
+import orjson
 from chalice import Response
 
 from pyocle.form import PaginationQueryParameters, FormValidationError
 from pyocle.serialization import CamelCaseAttributesMixin
 from pyocle.service.core import ResourceNotFoundError
 
+_LOGGER = logging.getLogger(__name__)
+
+# Messages shared by every response of the same kind
+_OK_MESSAGE = sys.intern('Request completed successfully')
+_BAD_MESSAGE = sys.intern('Given inputs were incorrect. Consult the below details to address the issue.')
+_INTERNAL_ERROR_MESSAGE = sys.intern('Request failed due to internal server error')
+
 
+@dataclass
 class ErrorDetail(CamelCaseAttributesMixin):
     """
     Represents a field error and details around why this field caused an error and other meta data.
     """
+    __slots__ = ('description', 'location')
 
-    def __init__(self, description: str, location: str):
-        self.description = description
-        self.location = location
-
-    def __eq__(self, other: object) -> bool:
-        return isinstance(other, ErrorDetail) and \
-               other.location == self.location and \
-               other.description == self.description
-
-    def __ne__(self, other: object) -> bool:
-        return not self == other
-
-    def __repr__(self):
-        return f'FieldErrorDetail(description={self.description}, location={self.location})'
+    description: str
+    location: str
 
 
+@dataclass(init=False)
 class PaginationDetails:
     """
     Model holding a particular requests pagination details
     """
+    __slots__ = ('page', 'limit')
+
+    page: int
+    limit: int
 
     def __init__(self, page: int, limit: int, **kwargs):
         self.page = page
         self.limit = limit
 
-    def __repr__(self):
-        return f'PaginationDetails(page={self.page}, limit={self.limit})'
-
 
+@dataclass(init=False)
 class MetaData(CamelCaseAttributesMixin):
     """
     Represents meta/introspected information about a response.
     """
+    __slots__ = ('message', 'error_details', 'pagination_details', 'schemas')
+
+    message: str
+    error_details: Sequence[ErrorDetail]
+    pagination_details: Union[PaginationDetails, Dict[str, Any]]
+    schemas: Dict[str, Any]
 
     def __init__(self,
                  message: str,
@@ -58,22 +70,6 @@ class MetaData(CamelCaseAttributesMixin):
         self.pagination_details = pagination_details or {}
         self.schemas = schemas or {}
 
-    def __eq__(self, other: object) -> bool:
-        return isinstance(other, MetaData) and \
-               other.message == self.message and \
-               other.schemas == self.schemas and \
-               other.error_details == self.error_details and \
-               other.pagination_details == self.pagination_details
-
-    def __ne__(self, other: object) -> bool:
-        return not self == other
-
-    def __repr__(self):
-        return (f'MetaData(message=\'{self.message}\','
-                f' error_details={self.error_details},'
-                f' pagination_details={self.pagination_details},'
-                f' schemas={self.schemas})')
-
 
 class ResponseBody:
     """
@@ -88,16 +84,48 @@ class ResponseBody:
         self.data = data
 
     def to_json(self):
-        return jsonpickle.dumps(self, unpicklable=False)
+        # Dataclasses are passed through to the default function so that camel casing is still applied to them
+        options = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(self, default=_serialize_object, option=options).decode('utf-8')
+
+
+def _serialize_object(obj: Any) -> Any:
+    """
+    Fallback used by orjson.dumps to convert objects that are not natively serializable.
+    Sets become lists, decimals become strings so that no precision is lost and binary data becomes a base64 string.
+    Camel case mixin instances are converted with their own state while all other objects use their attributes.
+
+    :param obj: The object that could not be natively serialized
+    :return: The serializable representation of the given object
+    """
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+
+    if isinstance(obj, Decimal):
+        return str(obj)
+
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return b64encode(obj).decode('ascii')
+
+    if isinstance(obj, CamelCaseAttributesMixin):
+        return obj.__getstate__()
+
+    # Slotted dataclasses do not carry a __dict__, so their fields are read directly
+    if is_dataclass(obj):
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+
+    try:
+        return vars(obj)
+    except TypeError:
+        raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
 
 
 def ok_metadata(pagination: Optional[PaginationQueryParameters] = None) -> MetaData:
     """
     :return: Successful request (Ok) meta data
     """
-    pagination_details = None if pagination is None else PaginationDetails(**pagination.dict())
-    return metadata(message='Request completed successfully',
-                    pagination_details=pagination_details)
+    pagination_details = PaginationDetails(**pagination.dict()) if pagination is not None else None
+    return metadata(message=_OK_MESSAGE, pagination_details=pagination_details)
 
 
 def bad_metadata(error_details: Sequence[ErrorDetail] = None,
@@ -108,7 +136,7 @@ def bad_metadata(error_details: Sequence[ErrorDetail] = None,
     :return: Bad request meta data
     """
     return metadata(
-        message='Given inputs were incorrect. Consult the below details to address the issue.',
+        message=_BAD_MESSAGE,
         error_details=error_details or [],
         schemas=schemas if schemas is not None else {}
     )
@@ -126,7 +154,7 @@ def internal_error_metadata() -> MetaData:
     """
     :return: Internal server error meta data
     """
-    return metadata(message='Request failed due to internal server error')
+    return metadata(message=_INTERNAL_ERROR_MESSAGE)
 
 
 def metadata(message: str,
@@ -150,6 +178,11 @@ def metadata(message: str,
     )
 
 
+# Bodies of responses that never change are serialized once up front.
+_BAD_BODY = ResponseBody(success=False, meta=bad_metadata()).to_json()
+_INTERNAL_ERROR_BODY = ResponseBody(success=False, meta=internal_error_metadata()).to_json()
+
+
 def ok(data: Any, pagination: Optional[PaginationQueryParameters] = None) -> Response:
     """
     :param data: Data that will be used to populate the response body
@@ -183,6 +216,9 @@ def bad(error_details: Sequence[ErrorDetail] = None,
     :param schemas: Schemas that will be displayed in meta information of response
     :return: Bad request response
     """
+    if not error_details and not schemas:
+        return Response(status_code=400, body=_BAD_BODY)
+
     response_metadata = bad_metadata(error_details=error_details, schemas=schemas)
     return response(400, response_metadata)
 
@@ -201,7 +237,7 @@ def internal_error() -> Response:
     """
     :return: Internal server error response
     """
-    return response(500, internal_error_metadata())
+    return Response(status_code=500, body=_INTERNAL_ERROR_BODY)
 
 
 def response(status_code: int,
@@ -237,23 +273,59 @@ def error_handler(decorated):
     :return: The decorated function wrapped with error handling capabilities
     """
 
+    @wraps(decorated)
     def wrapped_handler(*args, **kwargs):
         try:
             return decorated(*args, **kwargs)
-        except ResourceNotFoundError as ex:
-            return not_found(ex.identifier)
-        except FormValidationError as ex:
-            error_details = _build_error_details(ex.errors)
-            return bad(error_details=error_details, schemas=ex.schemas)
         except Exception as ex:
-            logger = logging.getLogger(__name__)
-            logger.error('Something crashed, view the below traceback for more information')
-            logger.exception(ex)
+            handler = _resolve_error_response_handler(type(ex))
+            if handler is not None:
+                return handler(ex)
+
+            if _LOGGER.isEnabledFor(logging.ERROR):
+                _LOGGER.error('Something crashed, view the below traceback for more information')
+                _LOGGER.exception(ex)
             return internal_error()
 
     return wrapped_handler
 
 
+def _not_found_error_response(ex: ResourceNotFoundError) -> Response:
+    return not_found(ex.identifier)
+
+
+def _form_validation_error_response(ex: FormValidationError) -> Response:
+    error_details = _build_error_details(ex.errors)
+    return bad(error_details=error_details, schemas=ex.schemas)
+
+
+# Known errors mapped to the functions building their responses. Any error not found here results in an internal error.
+_ERROR_RESPONSE_HANDLERS = {
+    ResourceNotFoundError: _not_found_error_response,
+    FormValidationError: _form_validation_error_response
+}
+
+
+@lru_cache(maxsize=None)
+def _resolve_error_response_handler(error_type: type) -> Optional[Callable[[Exception], Response]]:
+    """
+    Resolves the function that builds the response for a given error type. Subclasses of known errors resolve to their
+    parent's handler. Results are cached per error type so the lookup is a single dictionary hit after the first error.
+
+    :param error_type: The type of the raised error
+    :return: The function building the response or None if the error type is not known
+    """
+    for cls in error_type.__mro__:
+        handler = _ERROR_RESPONSE_HANDLERS.get(cls)
+        if handler is not None:
+            return handler
+
+    return None
+
+
+_location_and_message = itemgetter('loc', 'msg')
+
+
 def _build_error_details(errors: List[Dict[str, Any]]) -> Sequence[ErrorDetail]:
     """
     Creates list of error details from given pydantic errors
@@ -261,4 +333,4 @@ def _build_error_details(errors: List[Dict[str, Any]]) -> Sequence[ErrorDetail]:
     :param errors: List of pydantic errors
     :return: List of field error details built from given pydantic errors
     """
-    return [ErrorDetail(location='.'.join(error['loc']), description=error['msg']) for error in errors]
+    return [ErrorDetail(location='.'.join(loc), description=msg) for loc, msg in map(_location_and_message, errors)]
@@ -1,4 +1,5 @@
-import re
+from string import ascii_letters
+from typing import Tuple, Optional
 
 
 class CamelCaseAttributesMixin:
@@ -11,27 +12,64 @@ class CamelCaseAttributesMixin:
 
     WARNING: This is not a recursive solution. Only properties at the root field will be updated.
     """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Attribute names are fixed per class, so converted names are cached per class and only computed once.
+        cls._camel_case_keys = {}
+        # Classes that only use slots know all of their attributes up front. Their names are converted right away.
+        cls._camel_case_slots = _camel_case_slots(cls)
 
     def __getstate__(self):
-        def is_snake_case(value: str) -> bool:
-            """
-            Really shitty function that determines if a given string is formatted using snake case.
-            Simply checks for '_' character in the string.
-            :param value: The string to check for snake case formatting
-            :return: Whether the given string was formatted in snake case
-            """
-            return '_' in value
-
-        def to_camel_case(value: str) -> str:
-            """
-            Converts a given string to camel case
-            :param value: The snake case string that will be converted to camel case
-            :return: The converted string
-            """
-            return snake_case_to_camel_case(value) if is_snake_case(value) else value
+        if self._camel_case_slots is not None:
+            return {camel_case_key: getattr(self, key) for key, camel_case_key in self._camel_case_slots}
+
+        keys = self._camel_case_keys
 
         # Creates a new dictionary maintaining order while only replacing the names with camel cased names instead.
-        return {to_camel_case(key): value for key, value in self.__dict__.items()}
+        state = {}
+        for key, value in self.__dict__.items():
+            camel_case_key = keys.get(key)
+            if camel_case_key is None:
+                camel_case_key = keys[key] = snake_case_to_camel_case(key)
+            state[camel_case_key] = value
+
+        return state
+
+    def __setstate__(self, state):
+        # Copying and unpickling give back the camel cased state, so names are mapped back to their attributes
+        if self._camel_case_slots is not None:
+            for key, camel_case_key in self._camel_case_slots:
+                if camel_case_key in state:
+                    setattr(self, key, state[camel_case_key])
+            return
+
+        # Names that were never converted by this process are kept as is
+        keys = {camel_case_key: key for key, camel_case_key in self._camel_case_keys.items()}
+        for camel_case_key, value in state.items():
+            self.__dict__[keys.get(camel_case_key, camel_case_key)] = value
+
+
+def _camel_case_slots(cls: type) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """
+    Collects the slots of a given class along with their camel cased names.
+
+    :param cls: The class to collect slots from
+    :return: Slot and camel cased slot name pairs or None if instances of the class have a __dict__
+    """
+    slots = []
+    for klass in reversed(cls.__mro__[:-1]):
+        if '__slots__' not in klass.__dict__:
+            return None
+
+        klass_slots = klass.__dict__['__slots__']
+        slots.extend((klass_slots,) if isinstance(klass_slots, str) else klass_slots)
+
+    return tuple((slot, snake_case_to_camel_case(slot)) for slot in slots if slot not in ('__dict__', '__weakref__'))
+
+
+_ASCII_LETTERS = frozenset(ascii_letters)
 
 
 def snake_case_to_camel_case(value: str) -> str:
@@ -41,10 +79,15 @@ def snake_case_to_camel_case(value: str) -> str:
     :return: The given string in camel case format
     """
 
-    def convert(match):
-        return match.group(1) + match.group(2).upper()
+    # Splitting on underscores leaves strings without any underscores untouched, so there is no need to
+    # check for snake case beforehand. Only underscores followed by a letter are removed, upper casing that letter.
+    # All other underscores, such as those followed by a digit, another underscore or nothing, are kept.
+    parts = value.split('_')
+    camel_case = [parts[0]]
+    for part in parts[1:]:
+        if part[:1] in _ASCII_LETTERS:
+            camel_case.append(part[0].upper() + part[1:])
+        else:
+            camel_case.append('_' + part)
 
-    # Regex matches with text before and after an under score
-    # The convert function then upper cases the second group which is the text after the underscore
-    regex = r'(.*?)_([a-zA-Z])'
-    return re.sub(regex, convert, value, 0)
+    return ''.join(camel_case)
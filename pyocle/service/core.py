@@ -1,12 +1,92 @@
-from abc import abstractmethod, ABC
-from typing import Dict, Any
+import os
+import threading
+from abc import abstractmethod, ABCMeta
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Any, Iterable, Iterator, List, TypeVar, Callable
 
+from botocore.config import Config
 
-class BaseForm(ABC):
+
+class FormMeta(ABCMeta):
+    """
+    Metaclass of all forms. Forms that map attributes directly to AWS keys can declare a _FIELDS sequence of
+    (AWS key, attribute name, converter) entries, converter being an optional function applied to the attribute before
+    it is given to the service. _dict and _build_dict methods are then generated for the form when its class is
+    created, building and cleaning the dict representation in a single pass without walking it afterwards.
+    Subclasses overriding _dict without declaring _FIELDS build their dict from their own _dict again.
+    """
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        fields = namespace.get('_FIELDS')
+        if fields is not None:
+            namespace.update(_generate_dict_methods(fields))
+
+        cls = super().__new__(mcs, name, bases, namespace, **kwargs)
+        if fields is None and '_dict' in namespace and '_build_dict' not in namespace:
+            # The inherited generated _build_dict reads attributes directly and would ignore the overridden _dict
+            cls._build_dict = BaseForm._build_dict
+
+        cls._SLOT_ATTRIBUTES = tuple(slot
+                                     for klass in cls.__mro__
+                                     for slot in klass.__dict__.get('__slots__', ())
+                                     if slot != '_cached_dict')
+        return cls
+
+
+def _generate_dict_methods(fields) -> Dict[str, Callable]:
+    """
+    Generates straight line _dict and _build_dict methods from a form's _FIELDS.
+
+    :param fields: Sequence of (AWS key, attribute name, converter) entries
+    :return: The generated methods by name
+    """
+    method_globals = {'_clean': _clean}
+    dict_lines = ['def _dict(self):', '    return {']
+    build_dict_lines = ['def _build_dict(self):', '    form_dict = {}']
+    for index, (key, attribute, converter) in enumerate(fields):
+        if not attribute.isidentifier():
+            raise ValueError(f'Invalid form attribute name: {attribute}')
+
+        value = f'self.{attribute}'
+        if converter is not None:
+            method_globals[f'_convert_{index}'] = converter
+            value = f'_convert_{index}({value})'
+
+        dict_lines.append(f'        {key!r}: {value},')
+        build_dict_lines += [
+            f'    value = {value}',
+            '    if isinstance(value, dict):',
+            '        value = _clean(value)',
+            "    if value is not None and (not hasattr(value, '__len__') or len(value) > 0):",
+            f'        form_dict[{key!r}] = value'
+        ]
+
+    dict_lines.append('    }')
+    build_dict_lines.append('    return form_dict')
+
+    methods = {}
+    exec('\n'.join(dict_lines + build_dict_lines), method_globals, methods)
+    return methods
+
+
+class BaseForm(metaclass=FormMeta):
     """
     Represents a form or attributes that are needed to perform some AWS service action.
     Implementing this class is intended to provide a wrapper/interface around AWS boto3 client.
+
+    The final dict representation is cached once built and rebuilt whenever an attribute of the form is reassigned.
+    Forms are only cached while all of their attributes are immutable, lists, dicts or nested forms may be modified in
+    place without the form knowing. The returned dict may be shared and should not be modified.
+
+    Subclasses are expected to declare __slots__ for their attributes.
     """
+    __slots__ = ('_cached_dict',)
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != '_cached_dict':
+            super().__setattr__('_cached_dict', None)
 
     @abstractmethod
     def _dict(self):
@@ -15,19 +95,113 @@ class BaseForm(ABC):
         """
         pass
 
+    def _build_dict(self):
+        """
+        :return: The AWS dict representation without missing or empty values.
+        """
+        return _clean(self._dict())
+
     def dict(self):
         """
         :return: The final AWS dict representation that will be given to the service.
         """
+        cached_dict = getattr(self, '_cached_dict', None)
+        if cached_dict is not None:
+            return cached_dict
+
+        form_dict = self._build_dict()
+        if self._immutable():
+            self._cached_dict = form_dict
+
+        return form_dict
+
+    def _immutable(self) -> bool:
+        """
+        :return: Whether every attribute of the form holds an immutable value
+        """
+        for name in self._SLOT_ATTRIBUTES:
+            if not isinstance(getattr(self, name, None), _IMMUTABLE_TYPES):
+                return False
+
+        return all(isinstance(value, _IMMUTABLE_TYPES) for value in getattr(self, '__dict__', {}).values())
+
+
+# Attribute values that can not be modified in place
+_IMMUTABLE_TYPES = (str, bytes, int, float, type(None))
+
+
+def _valid_entry(key, value) -> bool:
+    """
+    :return: Whether the given entry should be given to the service. Missing and empty values are not.
+    """
+    return key is not None and value is not None and (not hasattr(value, '__len__') or len(value) > 0)
+
+
+def _clean(dictionary: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Removes all invalid entries from the given dictionary and any nested dictionaries.
+    Dictionaries are never modified. A copy is only made once an entry that needs to be removed or cleaned is found,
+    otherwise the given dictionary is returned as is.
+
+    :param dictionary: The dictionary to clean
+    :return: The cleaned dictionary
+    """
+    cleaned = None
+    for index, (key, value) in enumerate(dictionary.items()):
+        clean_value = _clean(value) if isinstance(value, dict) else value
+        valid = _valid_entry(key, clean_value)
+
+        if cleaned is None:
+            if valid and clean_value is value:
+                continue
+
+            # First change found, copy every entry seen so far
+            cleaned = dict(islice(dictionary.items(), index))
+
+        if valid:
+            cleaned[key] = clean_value
+
+    return dictionary if cleaned is None else cleaned
+
+
+T = TypeVar('T')
 
-        def clean_dict(dictionary: Dict[str, Any]):
-            return {key: clean_dict(value) if isinstance(value, dict) else value for key, value in dictionary.items()
-                    if valid_entry(key, value)}
 
-        def valid_entry(key, value) -> bool:
-            return key is not None and value is not None and len(value) > 0
+def chunked(iterable: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Splits given items into lists of at most the given size. Used to respect AWS limits on batch operations.
+
+    :param iterable: The items to split
+    :param size: The max size of every chunk
+    :return: Iterator of chunks
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+R = TypeVar('R')
+
+# Default amount of threads used to perform many service operations at once
+DEFAULT_MAX_WORKERS = 16
 
-        return clean_dict(self._dict())
+
+def map_concurrently(function: Callable[[T], R],
+                     iterable: Iterable[T],
+                     max_workers: int = DEFAULT_MAX_WORKERS) -> List[R]:
+    """
+    Calls the given function with every item using a pool of threads. Service operations are IO bound and boto3
+    clients are thread safe, so many operations can be waited on at once.
+
+    :param function: The function to call with every item
+    :param iterable: The items to call the function with
+    :param max_workers: The max amount of threads used
+    :return: The results of every call, in the same order as the given items
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, iterable))
 
 
 class ResourceNotFoundError(Exception):
@@ -38,3 +212,115 @@ class ResourceNotFoundError(Exception):
     def __init__(self, identifier: str, message: str = None):
         self.identifier = identifier
         self.message = message or f'Resource with id {identifier} could not be found'
+
+
+# Region of the current process, set by AWS Lambda. When present clients are constructed in this region without
+# botocore resolving it from its configuration chain.
+_REGION = os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION')
+
+# Configuration applied to every client constructed by pyocle. Connections are pooled, kept alive and time out
+# quickly when being opened, failed calls are retried with adaptive back off.
+DEFAULT_CLIENT_CONFIG = Config(
+    region_name=_REGION,
+    max_pool_connections=100,
+    connect_timeout=1,
+    tcp_keepalive=True,
+    retries={'max_attempts': 3, 'mode': 'adaptive'}
+)
+
+# Configuration merged on top of the default configuration for particular AWS services. botocore retries calls whose
+# response timed out, so only services whose calls are safe to repeat wait a short time for responses. Sending an email
+# or publishing a message again would deliver it twice, so SES and SNS keep botocore's default read timeout.
+_SERVICE_CLIENT_CONFIGS = {
+    'kms': DEFAULT_CLIENT_CONFIG.merge(Config(read_timeout=1))
+}
+
+
+def _client_config(service_name: str, config: Config = None) -> Config:
+    """
+    :param service_name: The name of the AWS service. Ex. 'kms', 'ses' or 'sns'
+    :param config: Configuration merged on top of the service's default configuration
+    :return: The configuration a client of the given service is constructed with
+    """
+    service_config = _SERVICE_CLIENT_CONFIGS.get(service_name, DEFAULT_CLIENT_CONFIG)
+    return service_config if config is None else service_config.merge(config)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+# Default clients shared by all services within this process. Constructing a client loads service models from disk and
+# sets up a new connection pool, so this is only done once per AWS service.
+_default_clients = {}
+_default_clients_lock = threading.Lock()
+
+
+def create_client(service_name: str, config: Config = None):
+    """
+    Constructs a new boto3 client for a given AWS service. boto3 sessions are not thread safe, so construction is
+    guarded by a lock. boto3 is imported the first time a client is constructed, keeping it out of the import time
+    of pyocle.
+
+    :param service_name: The name of the AWS service. Ex. 'kms', 'ses' or 'sns'
+    :param config: Configuration merged on top of the default client configuration of the service
+    :return: The constructed boto3 client
+    """
+    global _session
+
+    client_config = _client_config(service_name, config)
+    with _session_lock:
+        if _session is None:
+            import boto3
+            _session = boto3.session.Session()
+
+        return _session.client(service_name, config=client_config)
+
+
+def default_client(service_name: str):
+    """
+    Retrieves the shared boto3 client for a given AWS service. The client is lazily constructed the first time it is
+    requested and reused afterwards.
+
+    :param service_name: The name of the AWS service. Ex. 'kms', 'ses' or 'sns'
+    :return: The shared boto3 client
+    """
+    client = _default_clients.get(service_name)
+    if client is None:
+        with _default_clients_lock:
+            client = _default_clients.get(service_name)
+            if client is None:
+                client = _default_clients[service_name] = create_client(service_name)
+
+    return client
+
+
+_async_session = None
+
+
+def async_client(service_name: str, config: Config = None):
+    """
+    Constructs an aioboto3 client for a given AWS service. Requires the optional aioboto3 dependency which can be
+    installed with the async extra: pip install pyocle[async]
+
+    A new client, and with it a new connection, is opened every time. Clients are not shared between calls.
+
+    Ex.
+    async with async_client('kms') as client:
+        await client.encrypt(...)
+
+    :param service_name: The name of the AWS service. Ex. 'kms', 'ses' or 'sns'
+    :param config: Configuration merged on top of the default client configuration of the service
+    :return: Async context manager providing the aioboto3 client
+    """
+    global _async_session
+
+    if _async_session is None:
+        try:
+            import aioboto3
+        except ImportError:
+            raise ImportError('Async operations require aioboto3. Install it with: pip install pyocle[async]')
+
+        _async_session = aioboto3.Session()
+
+    client_config = _client_config(service_name, config)
+    return _async_session.client(service_name, config=client_config)
@@ -1,10 +1,17 @@
-import base64
+import os
+import struct
+import threading
+import time
+from base64 import b64decode
+from collections import OrderedDict
 from enum import Enum
-from typing import Dict, Any, Union, List
+from typing import Dict, Any, Union, List, Optional, Hashable, Iterable
 
-import boto3
+import orjson
+from botocore.config import Config
 
-from pyocle.service.core import BaseForm
+from pyocle.service.core import BaseForm, default_client, create_client, async_client, map_concurrently, \
+    DEFAULT_MAX_WORKERS
 
 
 class EncryptionAlgorithm(Enum):
@@ -17,6 +24,22 @@ class EncryptionAlgorithm(Enum):
     RSAES_OAEP_SHA_256 = 'RSAES_OAEP_SHA_256'
 
 
+# Enum values looked up ahead of time, skipping the Enum.value descriptor. Strings map to nothing and are kept as is.
+_ALG_TO_STR = {algorithm: algorithm.value for algorithm in EncryptionAlgorithm}
+
+
+class DataKeySpec(Enum):
+    """
+    Length of the data keys aws kms will generate
+    """
+
+    AES_256 = 'AES_256'
+    AES_128 = 'AES_128'
+
+
+_KEY_SPEC_TO_STR = {key_spec: key_spec.value for key_spec in DataKeySpec}
+
+
 class EncryptForm(BaseForm):
     """
     Form exposing a type safe API expressing what information
@@ -24,6 +47,14 @@ class EncryptForm(BaseForm):
 
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/kms.html#KMS.Client.encrypt
     """
+    __slots__ = ('key_id', 'plain_text', 'encryption_context', 'grant_tokens', 'encryption_algorithm')
+    _FIELDS = (
+        ('KeyId', 'key_id', None),
+        ('Plaintext', 'plain_text', None),
+        ('EncryptionContext', 'encryption_context', None),
+        ('GrantTokens', 'grant_tokens', None),
+        ('EncryptionAlgorithm', 'encryption_algorithm', None)
+    )
 
     def __init__(self,
                  *,
@@ -31,21 +62,24 @@ class EncryptForm(BaseForm):
                  plain_text: Union[str, bytes],
                  encryption_context: Dict[str, str] = None,
                  grant_tokens: List[str] = None,
-                 encryption_algorithm: EncryptionAlgorithm = None):
+                 encryption_algorithm: Union[EncryptionAlgorithm, str] = None):
         self.key_id = key_id
         self.plain_text = plain_text
         self.encryption_context = encryption_context
         self.grant_tokens = grant_tokens
-        self.encryption_algorithm = encryption_algorithm
+        self.encryption_algorithm = _ALG_TO_STR.get(encryption_algorithm, encryption_algorithm)
 
-    def _dict(self):
-        return {
-            'KeyId': self.key_id,
-            'Plaintext': self.plain_text,
-            'EncryptionContext': self.encryption_context,
-            'GrantTokens': self.grant_tokens,
-            'EncryptionAlgorithm': self.encryption_algorithm.value if self.encryption_algorithm else None
-        }
+
+def _decode_cipher_text_blob(blob: Union[str, bytes, bytearray, memoryview, None]):
+    """
+    Binary cipher text (bytes or bytearray) is given to the service as is without being copied. Base64 encoded strings
+    are decoded and memoryviews are copied into bytes, since botocore does not accept them.
+    """
+    if isinstance(blob, str):
+        return b64decode(blob)
+    if isinstance(blob, memoryview):
+        return bytes(blob)
+    return blob
 
 
 class DecryptForm(BaseForm):
@@ -55,33 +89,57 @@ class DecryptForm(BaseForm):
 
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/kms.html#KMS.Client.decrypt
     """
+    __slots__ = ('cipher_text_blob', 'encryption_context', 'grant_tokens', 'key_id', 'encryption_algorithm')
+    _FIELDS = (
+        ('CiphertextBlob', 'cipher_text_blob', _decode_cipher_text_blob),
+        ('EncryptionContext', 'encryption_context', None),
+        ('GrantTokens', 'grant_tokens', None),
+        ('KeyId', 'key_id', None),
+        ('EncryptionAlgorithm', 'encryption_algorithm', None)
+    )
 
     def __init__(self,
                  *,
-                 cipher_text_blob: Union[str, bytes],
+                 cipher_text_blob: Union[str, bytes, bytearray, memoryview],
                  encryption_context: Dict[str, str] = None,
                  grant_tokens: List[str] = None,
                  key_id: str = None,
-                 encryption_algorithm: EncryptionAlgorithm = None):
+                 encryption_algorithm: Union[EncryptionAlgorithm, str] = None):
         self.cipher_text_blob = cipher_text_blob
         self.encryption_context = encryption_context
         self.grant_tokens = grant_tokens
         self.key_id = key_id
-        self.encryption_algorithm = encryption_algorithm
+        self.encryption_algorithm = _ALG_TO_STR.get(encryption_algorithm, encryption_algorithm)
 
-    def _dict(self):
-        blob = self.cipher_text_blob
-        if isinstance(blob, str):
-            blob = base64.b64decode(blob)
-            KeyManagementService()
 
-        return {
-            'CiphertextBlob': blob,
-            'EncryptionContext': self.encryption_context,
-            'GrantTokens': self.grant_tokens,
-            'KeyId': self.key_id,
-            'EncryptionAlgorithm': self.encryption_algorithm.value if self.encryption_algorithm else None
-        }
+class GenerateDataKeyForm(BaseForm):
+    """
+    Form exposing a type safe API expressing what information
+    is required when generating a data key with AWS KMS.
+
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/kms.html#KMS.Client.generate_data_key
+    """
+    __slots__ = ('key_id', 'encryption_context', 'number_of_bytes', 'key_spec', 'grant_tokens')
+    _FIELDS = (
+        ('KeyId', 'key_id', None),
+        ('EncryptionContext', 'encryption_context', None),
+        ('NumberOfBytes', 'number_of_bytes', None),
+        ('KeySpec', 'key_spec', None),
+        ('GrantTokens', 'grant_tokens', None)
+    )
+
+    def __init__(self,
+                 *,
+                 key_id: str,
+                 encryption_context: Dict[str, str] = None,
+                 number_of_bytes: int = None,
+                 key_spec: Union[DataKeySpec, str] = None,
+                 grant_tokens: List[str] = None):
+        self.key_id = key_id
+        self.encryption_context = encryption_context
+        self.number_of_bytes = number_of_bytes
+        self.key_spec = _KEY_SPEC_TO_STR.get(key_spec, key_spec)
+        self.grant_tokens = grant_tokens
 
 
 class KeyManagementService:
@@ -89,14 +147,18 @@ class KeyManagementService:
     Service used to interface with AWS KMS.
     """
 
-    def __init__(self, client=None):
+    def __init__(self, client=None, config: Config = None):
         """
         Constructs a new Key Management Service with a boto3 kms client
 
         :param client: Client that will be used to interface with AWS KMS.
                         It is unlikely that you will ever need to pass another client to this constructor.
+                        By default a client shared by all services in this process is used.
+        :param config: Client configuration used to construct a dedicated client instead of using the shared one.
+                        Merged on top of the default client configuration.
         """
-        self.client = client or boto3.client('kms')
+        self.client = client or (default_client('kms') if config is None else create_client('kms', config))
+        self.config = config
 
     def encrypt(self, form: EncryptForm) -> Dict[str, Any]:
         """
@@ -115,3 +177,225 @@ class KeyManagementService:
         :return: The client response
         """
         return self.client.decrypt(**form.dict())
+
+    def generate_data_key(self, form: GenerateDataKeyForm) -> Dict[str, Any]:
+        """
+        https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/kms.html#KMS.Client.generate_data_key
+
+        :param form: Details that will be used to perform the generate data key operation
+        :return: The client response
+        """
+        return self.client.generate_data_key(**form.dict())
+
+    def encrypt_many(self,
+                     forms: Iterable[EncryptForm],
+                     max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict[str, Any]]:
+        """
+        Performs many encrypt operations at once using a pool of threads.
+
+        :param forms: Details that will be used to perform the encrypt operations
+        :param max_workers: The max amount of operations performed at once
+        :return: The client responses, in the same order as the given forms
+        """
+        return map_concurrently(self.encrypt, forms, max_workers)
+
+    def decrypt_many(self,
+                     forms: Iterable[DecryptForm],
+                     max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict[str, Any]]:
+        """
+        Performs many decrypt operations at once using a pool of threads.
+
+        :param forms: Details that will be used to perform the decrypt operations
+        :param max_workers: The max amount of operations performed at once
+        :return: The client responses, in the same order as the given forms
+        """
+        return map_concurrently(self.decrypt, forms, max_workers)
+
+    async def aencrypt(self, form: EncryptForm) -> Dict[str, Any]:
+        """
+        Async variant of encrypt. Requires the optional aioboto3 dependency.
+
+        :param form: Details that will be used to perform the encrypt operation
+        :return: The client response
+        """
+        async with async_client('kms', self.config) as client:
+            return await client.encrypt(**form.dict())
+
+    async def adecrypt(self, form: DecryptForm) -> Dict[str, Any]:
+        """
+        Async variant of decrypt. Requires the optional aioboto3 dependency.
+
+        :param form: Details that will be used to perform the decrypt operation
+        :return: The client response
+        """
+        async with async_client('kms', self.config) as client:
+            return await client.decrypt(**form.dict())
+
+
+class _ExpiringCache:
+    """
+    Thread safe least recently used cache whose entries expire after a max age.
+    """
+
+    def __init__(self, max_size: int, max_age: float):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.max_age)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+# Cached messages start with a version and the length of the encrypted data key followed by the encrypted data key,
+# the nonce and finally the AES-GCM cipher text.
+_CACHED_MESSAGE_VERSION = 1
+_CACHED_MESSAGE_HEADER = struct.Struct('>BH')
+_NONCE_SIZE = 12
+# Size of the AES-GCM authentication tag appended to the cipher text
+_TAG_SIZE = 16
+
+
+class CachingKeyManagementService:
+    """
+    Service used to encrypt and decrypt data with envelope encryption while caching data keys.
+    Rather than sending every message to AWS KMS, a data key is generated once per key and encryption context and
+    messages are encrypted locally with AES-GCM. KMS is only called when a data key is not cached, which is
+    the same approach taken by the AWS Encryption SDK's local cryptographic materials cache.
+
+    Messages encrypted by this service can only be decrypted by this service.
+    Requires the optional cryptography dependency which can be installed with the caching extra:
+    pip install pyocle[caching]
+    """
+
+    def __init__(self,
+                 kms: KeyManagementService = None,
+                 max_size: int = 128,
+                 max_age: float = 300,
+                 max_messages_per_key: int = 2 ** 32):
+        """
+        Constructs a new Caching Key Management Service
+
+        :param kms: Service used to generate and decrypt data keys.
+                    By default a service using the shared client is used.
+        :param max_size: Max amount of data keys that are cached for both encryption and decryption.
+        :param max_age: Max amount of seconds a data key is cached for.
+        :param max_messages_per_key: Max amount of messages encrypted with a single data key before a new one is
+                                     generated.
+        """
+        try:
+            from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        except ImportError:
+            raise ImportError(
+                'Caching key management service requires cryptography. Install it with: pip install pyocle[caching]')
+
+        self._cipher = AESGCM
+        self.kms = kms or KeyManagementService()
+        self.max_messages_per_key = max_messages_per_key
+        self._encryption_keys = _ExpiringCache(max_size, max_age)
+        self._decryption_keys = _ExpiringCache(max_size, max_age)
+        # Guards the amount of messages encrypted with every cached data key
+        self._usage_lock = threading.Lock()
+
+    def encrypt(self, key_id: str, plain_text: Union[str, bytes], encryption_context: Dict[str, str] = None) -> bytes:
+        """
+        Encrypts given plain text with a cached data key protected by the given KMS key.
+
+        :param key_id: The KMS key protecting the data key
+        :param plain_text: The data to encrypt
+        :param encryption_context: Context that must also be given when decrypting the message
+        :return: The encrypted message
+        """
+        if isinstance(plain_text, str):
+            plain_text = plain_text.encode('utf-8')
+
+        context = _serialize_encryption_context(encryption_context)
+        cache_key = (key_id, context)
+
+        with self._usage_lock:
+            entry = self._encryption_keys.get(cache_key)
+            if entry is not None and entry[2] < self.max_messages_per_key:
+                entry[2] += 1
+            else:
+                entry = None
+
+        if entry is None:
+            form = GenerateDataKeyForm(key_id=key_id,
+                                       encryption_context=encryption_context,
+                                       key_spec=DataKeySpec.AES_256)
+            response = self.kms.generate_data_key(form)
+            # The new data key is used for this message right away
+            entry = [response['Plaintext'], response['CiphertextBlob'], 1]
+            self._encryption_keys.put(cache_key, entry)
+            self._decryption_keys.put((entry[1], context), entry[0])
+
+        plain_key, encrypted_key = entry[0], entry[1]
+
+        header = _CACHED_MESSAGE_HEADER.pack(_CACHED_MESSAGE_VERSION, len(encrypted_key)) + encrypted_key
+        nonce = os.urandom(_NONCE_SIZE)
+        cipher_text = self._cipher(plain_key).encrypt(nonce, plain_text, header + context)
+        return header + nonce + cipher_text
+
+    def decrypt(self, message: bytes, encryption_context: Dict[str, str] = None) -> bytes:
+        """
+        Decrypts a message previously encrypted by this service. KMS is only called when the data key used to
+        encrypt the message is not cached.
+
+        :param message: The encrypted message
+        :param encryption_context: Context the message was encrypted with
+        :return: The decrypted data
+        """
+        message = bytes(message)
+        if len(message) < _CACHED_MESSAGE_HEADER.size:
+            raise ValueError('Message is too short to have been encrypted by this service')
+
+        version, encrypted_key_length = _CACHED_MESSAGE_HEADER.unpack_from(message)
+        if version != _CACHED_MESSAGE_VERSION:
+            raise ValueError(f'Unsupported message version: {version}')
+
+        key_end = _CACHED_MESSAGE_HEADER.size + encrypted_key_length
+        if len(message) < key_end + _NONCE_SIZE + _TAG_SIZE:
+            raise ValueError('Message is too short to have been encrypted by this service')
+
+        encrypted_key = message[_CACHED_MESSAGE_HEADER.size:key_end]
+        nonce = message[key_end:key_end + _NONCE_SIZE]
+        cipher_text = message[key_end + _NONCE_SIZE:]
+
+        context = _serialize_encryption_context(encryption_context)
+        cache_key = (encrypted_key, context)
+
+        plain_key = self._decryption_keys.get(cache_key)
+        if plain_key is None:
+            form = DecryptForm(cipher_text_blob=encrypted_key, encryption_context=encryption_context)
+            plain_key = self.kms.decrypt(form)['Plaintext']
+            self._decryption_keys.put(cache_key, plain_key)
+
+        return self._cipher(plain_key).decrypt(nonce, cipher_text, message[:key_end] + context)
+
+
+def _serialize_encryption_context(encryption_context: Optional[Dict[str, str]]) -> bytes:
+    """
+    :return: Stable byte representation of an encryption context used as cache key and additional authenticated data
+    """
+    if not encryption_context:
+        return b''
+
+    return orjson.dumps(encryption_context, option=orjson.OPT_SORT_KEYS)
@@ -1,9 +1,21 @@
-from typing import List, Dict, Union, Any
+from typing import List, Dict, Union, Any, Iterable
 
-import boto3
-import jsonpickle
+import orjson
+from botocore.config import Config
 
-from pyocle.service.core import BaseForm
+from pyocle.service.core import BaseForm, default_client, create_client, async_client, chunked, map_concurrently, \
+    DEFAULT_MAX_WORKERS
+
+
+# Max amount of destinations AWS SES accepts in a single bulk templated email request
+_BULK_TEMPLATED_EMAIL_LIMIT = 50
+
+# Templated email keys that differ per destination in bulk templated email requests, mapped to their bulk names
+_BULK_DESTINATION_KEYS = {
+    'Destination': 'Destination',
+    'Tags': 'ReplacementTags',
+    'TemplateData': 'ReplacementTemplateData'
+}
 
 
 class EmailTag:
@@ -11,16 +23,23 @@ class EmailTag:
     Form exposing a type safe API expressing what information
     is required when attaching an email tag to an email
     """
+    __slots__ = ('name', 'value', '_cached_dict')
 
     def __init__(self, *, name: str, value: str):
         self.name = name
         self.value = value
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name != '_cached_dict':
+            # Built right away since tags are always converted. Rebuilt whenever the name or value changes.
+            super().__setattr__('_cached_dict', {
+                'Name': getattr(self, 'name', None),
+                'Value': getattr(self, 'value', None)
+            })
+
     def dict(self) -> Dict[str, str]:
-        return {
-            'Name': self.name,
-            'Value': self.value
-        }
+        return self._cached_dict
 
 
 class BaseEmailForm(BaseForm):
@@ -28,6 +47,8 @@ class BaseEmailForm(BaseForm):
     Form used to represent an email sent from AWS SES.
     Contains base properties that all sent emails could possibly contain.
     """
+    __slots__ = ('source', 'to_addresses', 'cc_addresses', 'bcc_addresses', 'reply_to_addresses', 'source_arn',
+                 'return_path', 'return_path_arn', 'tags', 'configuration_set')
 
     def __init__(self,
                  *,
@@ -76,6 +97,7 @@ class EmailForm(BaseEmailForm):
     Form exposing a type safe API expressing what information
     is required when sending an email with AWS SES
     """
+    __slots__ = ('subject', 'subject_charset', 'text', 'text_charset', 'html', 'html_charset')
 
     def __init__(self,
                  *,
@@ -98,25 +120,27 @@ class EmailForm(BaseEmailForm):
             raise ValueError('Html or text content must be specified')
 
     def _dict(self):
-        return {
-            **super()._dict(),
-            'Message': {
-                'Subject': {
-                    'Data': self.subject,
-                    'Charset': self.subject_charset
-                },
-                'Body': {
-                    'Text' if self.text is not None else None: {
-                        'Data': self.text,
-                        'Charset': self.text_charset
-                    },
-                    'Html' if self.html is not None else None: {
-                        'Data': self.html,
-                        'Charset': self.html_charset
-                    }
-                }
+        body = {}
+        if self.text is not None:
+            body['Text'] = {
+                'Data': self.text,
+                'Charset': self.text_charset
+            }
+        if self.html is not None:
+            body['Html'] = {
+                'Data': self.html,
+                'Charset': self.html_charset
             }
+
+        form_dict = super()._dict()
+        form_dict['Message'] = {
+            'Subject': {
+                'Data': self.subject,
+                'Charset': self.subject_charset
+            },
+            'Body': body
         }
+        return form_dict
 
 
 class TemplatedEmailForm(BaseEmailForm):
@@ -124,6 +148,7 @@ class TemplatedEmailForm(BaseEmailForm):
     Form exposing a type safe API expressing what information
     is required when sending a templated email AWS SES.
     """
+    __slots__ = ('template', 'template_data')
 
     def __init__(self,
                  *,
@@ -138,13 +163,36 @@ class TemplatedEmailForm(BaseEmailForm):
         # Make sure data is in string json format, if not, serialize it
         data = self.template_data
         if isinstance(data, dict):
-            data = jsonpickle.dumps(data, unpicklable=True)
+            data = orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
 
-        return {
-            **super()._dict(),
-            'Template': self.template,
-            'TemplateData': data
-        }
+        form_dict = super()._dict()
+        form_dict['Template'] = self.template
+        form_dict['TemplateData'] = data
+        return form_dict
+
+
+def _bulk_templated_email_request(forms: List[TemplatedEmailForm]) -> Dict[str, Any]:
+    """
+    Combines templated email forms into a single bulk templated email request. Forms may only differ in their
+    destination, tags and template data.
+
+    :param forms: The forms to combine
+    :return: The bulk templated email request
+    """
+    request = None
+    destinations = []
+    for form in forms:
+        form_dict = dict(form.dict())
+        destination = {_BULK_DESTINATION_KEYS[key]: form_dict.pop(key)
+                       for key in _BULK_DESTINATION_KEYS if key in form_dict}
+        destinations.append(destination)
+
+        if request is None:
+            request = form_dict
+        elif request != form_dict:
+            raise ValueError('Emails sent in bulk may only differ in their destination, tags and template data')
+
+    return {**request, 'DefaultTemplateData': '{}', 'Destinations': destinations}
 
 
 class SimpleEmailService:
@@ -152,14 +200,18 @@ class SimpleEmailService:
     Service used to interface with AWS SES.
     """
 
-    def __init__(self, client=None):
+    def __init__(self, client=None, config: Config = None):
         """
         Constructs a new Simple Email Service with a boto3 SES client
 
         :param client: Client that will be used to interface with AWS SES.
                        It is unlikely that you will ever need to pass another client to this constructor.
+                       By default a client shared by all services in this process is used.
+        :param config: Client configuration used to construct a dedicated client instead of using the shared one.
+                       Merged on top of the default client configuration.
         """
-        self.client = client or boto3.client('ses')
+        self.client = client or (default_client('ses') if config is None else create_client('ses', config))
+        self.config = config
 
     def send_email(self, form: EmailForm):
         """
@@ -178,3 +230,61 @@ class SimpleEmailService:
         :return: Client response
         """
         return self.client.send_templated_email(**form.dict())
+
+    def send_bulk_templated_email(self, forms: Iterable[TemplatedEmailForm]) -> List[Dict[str, Any]]:
+        """
+        Sends many templated emails with as few requests as possible. Emails are sent in batches of up to 50
+        destinations per request. Emails may only differ in their destination, tags and template data.
+
+        https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/ses.html#SES.Client.send_bulk_templated_email
+
+        :param forms: Details that will be used to send templated emails
+        :return: Client responses, one for every bulk request made
+        """
+
+        # Build every request up front so invalid forms are detected before any email is sent
+        requests = [_bulk_templated_email_request(chunk) for chunk in chunked(forms, _BULK_TEMPLATED_EMAIL_LIMIT)]
+        return [self.client.send_bulk_templated_email(**request) for request in requests]
+
+    def send_email_many(self, forms: Iterable[EmailForm], max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Sends many emails at once using a pool of threads.
+
+        :param forms: Details that will be used to send emails
+        :param max_workers: The max amount of emails sent at once
+        :return: Client responses, in the same order as the given forms
+        """
+        return map_concurrently(self.send_email, forms, max_workers)
+
+    def send_templated_email_many(self,
+                                  forms: Iterable[TemplatedEmailForm],
+                                  max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Sends many templated emails at once using a pool of threads.
+        Prefer send_bulk_templated_email when emails only differ in their destination, tags and template data.
+
+        :param forms: Details that will be used to send templated emails
+        :param max_workers: The max amount of emails sent at once
+        :return: Client responses, in the same order as the given forms
+        """
+        return map_concurrently(self.send_templated_email, forms, max_workers)
+
+    async def asend_email(self, form: EmailForm):
+        """
+        Async variant of send_email. Requires the optional aioboto3 dependency.
+
+        :param form: Details that will be used to send an email
+        :return: Client response
+        """
+        async with async_client('ses', self.config) as client:
+            return await client.send_email(**form.dict())
+
+    async def asend_templated_email(self, form: TemplatedEmailForm):
+        """
+        Async variant of send_templated_email. Requires the optional aioboto3 dependency.
+
+        :param form: Details that will be used to send a templated email
+        :return: Client response
+        """
+        async with async_client('ses', self.config) as client:
+            return await client.send_templated_email(**form.dict())
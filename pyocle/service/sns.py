@@ -1,16 +1,31 @@
-import json
-from typing import Union, Dict, Any
+from types import MappingProxyType
+from typing import Union, Dict, Any, Iterable, List, Mapping
 
-import boto3
+import orjson
+from botocore.config import Config
 
-from pyocle.service.core import BaseForm
+from pyocle.service.core import BaseForm, default_client, create_client, async_client, chunked, map_concurrently, \
+    DEFAULT_MAX_WORKERS
+
+
+# Max amount of messages AWS SNS accepts in a single publish batch request
+_PUBLISH_BATCH_LIMIT = 10
 
 
 class MessageAttribute(BaseForm):
     """
     Form exposing a type safe API expressing what information
     is required when attaching a message attribute to a message
+
+    The dict representation is built when the attribute is constructed since attributes are always converted,
+    and rebuilt whenever one of its attributes is reassigned.
     """
+    __slots__ = ('data_type', 'string_value', 'binary_value')
+    _FIELDS = (
+        ('DataType', 'data_type', None),
+        ('StringValue', 'string_value', None),
+        ('BinaryValue', 'binary_value', None)
+    )
 
     def __init__(self,
                  *,
@@ -20,20 +35,43 @@ class MessageAttribute(BaseForm):
         self.data_type = data_type
         self.string_value = string_value
         self.binary_value = binary_value
+        self.dict()
+
+
+def _serialize_message(message: Union[str, Dict[str, Any]]) -> str:
+    """
+    Dict messages are serialized to json, string messages are given to the service as is.
+    """
+    if isinstance(message, dict):
+        return orjson.dumps(message, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    return message
 
-    def _dict(self):
-        return {
-            'DataType': self.data_type,
-            'StringValue': self.string_value,
-            'BinaryValue': self.binary_value
-        }
+
+def _convert_message_attributes(message_attributes: Mapping[str, MessageAttribute]) -> Dict[str, Dict[str, Any]]:
+    """
+    boto3 only accepts plain dicts, so attributes are converted into a new dict every time the form is converted.
+    """
+    return {key: attribute.dict() for key, attribute in message_attributes.items()}
 
 
 class PublishMessageForm(BaseForm):
     """
     Form exposing a type safe API expressing what information
     is required when publish a message with AWS SNS.
+
+    Message attributes are read only. Reassign them to add or remove an attribute.
     """
+    __slots__ = ('message', 'topic_arn', 'target_arn', 'phone_number', 'subject', 'message_structure',
+                 'message_attributes')
+    _FIELDS = (
+        ('Message', 'message', _serialize_message),
+        ('Subject', 'subject', None),
+        ('TopicArn', 'topic_arn', None),
+        ('TargetArn', 'target_arn', None),
+        ('MessageStructure', 'message_structure', None),
+        ('MessageAttributes', 'message_attributes', _convert_message_attributes)
+    )
 
     def __init__(self,
                  *,
@@ -43,31 +81,38 @@ class PublishMessageForm(BaseForm):
                  phone_number: str = None,
                  subject: str = None,
                  message_structure: str = None,
-                 message_attributes: Dict[str, MessageAttribute] = None):
+                 message_attributes: Mapping[str, MessageAttribute] = None):
         self.message = message
         self.topic_arn = topic_arn
         self.target_arn = target_arn
         self.phone_number = phone_number
         self.subject = subject
         self.message_structure = message_structure
-        self.message_attributes = message_attributes or {}
+        self.message_attributes = message_attributes
 
         if phone_number is None and topic_arn is None and target_arn is None:
             raise ValueError('A phone number, topic or target must be specified')
 
-    def _dict(self):
-        message = self.message
-        if isinstance(message, dict):
-            message = json.dumps(message)
+    def __setattr__(self, name, value):
+        if name == 'message_attributes':
+            value = MappingProxyType(dict(value or {}))
 
-        return {
-            'Message': message,
-            'Subject': self.subject,
-            'TopicArn': self.topic_arn,
-            'TargetArn': self.target_arn,
-            'MessageStructure': self.message_structure,
-            'MessageAttributes': {key: value.dict() for key, value in self.message_attributes.items()}
-        }
+        super().__setattr__(name, value)
+
+
+def _publish_batch_entry(entry_id: str, form: PublishMessageForm) -> Dict[str, Any]:
+    """
+    Converts a publish message form into an entry of a publish batch request. The topic is defined once per
+    batch request rather than on every entry.
+
+    :param entry_id: Identifier of the entry. Must be unique within the batch request
+    :param form: The form to convert
+    :return: The publish batch request entry
+    """
+    entry = dict(form.dict())
+    entry.pop('TopicArn', None)
+    entry['Id'] = entry_id
+    return entry
 
 
 class SimpleNotificationService:
@@ -75,14 +120,18 @@ class SimpleNotificationService:
     Service used to interface with AWS SNS.
     """
 
-    def __init__(self, client=None):
+    def __init__(self, client=None, config: Config = None):
         """
         Constructs a new Simple Notification Service with a boto3 SNS client
 
         :param client: Client that will be used to interface with AWS SES.
                        It is unlikely that you will ever need to pass another client to this constructor.
+                       By default a client shared by all services in this process is used.
+        :param config: Client configuration used to construct a dedicated client instead of using the shared one.
+                       Merged on top of the default client configuration.
         """
-        self.client = client or boto3.client('sns')
+        self.client = client or (default_client('sns') if config is None else create_client('sns', config))
+        self.config = config
 
     def publish(self, form: PublishMessageForm):
         """
@@ -92,3 +141,50 @@ class SimpleNotificationService:
         :return: Client response
         """
         return self.client.publish(**form.dict())
+
+    def publish_batch(self, forms: Iterable[PublishMessageForm]) -> List[Dict[str, Any]]:
+        """
+        Publishes many messages with as few requests as possible. Messages are grouped by topic and sent in batches
+        of up to 10 messages per request. Only messages published to a topic without a target can be batched.
+
+        https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/sns.html#SNS.Client.publish_batch
+
+        :param forms: Details that will be used to publish messages
+        :return: Client responses, one for every batch request made
+        """
+        forms_by_topic = {}
+        for form in forms:
+            if form.topic_arn is None:
+                raise ValueError('Only messages published to a topic can be published in batches')
+            if form.target_arn is not None:
+                raise ValueError('Messages published to a target can not be published in batches')
+            forms_by_topic.setdefault(form.topic_arn, []).append(form)
+
+        responses = []
+        for topic_arn, topic_forms in forms_by_topic.items():
+            for chunk in chunked(topic_forms, _PUBLISH_BATCH_LIMIT):
+                entries = [_publish_batch_entry(str(index), form) for index, form in enumerate(chunk)]
+                responses.append(self.client.publish_batch(TopicArn=topic_arn, PublishBatchRequestEntries=entries))
+
+        return responses
+
+    def publish_many(self, forms: Iterable[PublishMessageForm], max_workers: int = DEFAULT_MAX_WORKERS):
+        """
+        Publishes many messages at once using a pool of threads. Unlike publish_batch, messages do not need to be
+        published to a topic.
+
+        :param forms: Details that will be used to publish messages
+        :param max_workers: The max amount of messages published at once
+        :return: Client responses, in the same order as the given forms
+        """
+        return map_concurrently(self.publish, forms, max_workers)
+
+    async def apublish(self, form: PublishMessageForm):
+        """
+        Async variant of publish. Requires the optional aioboto3 dependency.
+
+        :param form: Details that will be used to publish a message
+        :return: Client response
+        """
+        async with async_client('sns', self.config) as client:
+            return await client.publish(**form.dict())
@@ -19,10 +19,14 @@ setuptools.setup(
     python_requires='>=3',
     install_requires=[
         'pydantic',
-        'boto3',
-        'jsonpickle',
+        'boto3>=1.24.84',
+        'orjson',
         'chalice'
     ],
+    extras_require={
+        'async': ['aioboto3'],
+        'caching': ['cryptography']
+    },
     keywords=[
         'library',
         'chalice'
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class DummyForm(BaseModel):
+    first_name: str
+    last_name: str
@@ -1,13 +1,29 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
 from collections import namedtuple
 from typing import Dict
 
 import pytest
+from botocore.config import Config
 
+from pyocle.service import core
 from pyocle.service.core import BaseForm
 
 FormTestFixture = namedtuple(typename='FormTestFixture', field_names='value,dict')
 
 
+def form_kwargs(form) -> dict:
+    """
+    Reads the public slots of a form, which match its constructor keyword arguments
+    """
+    return {slot: getattr(form, slot)
+            for klass in type(form).__mro__
+            for slot in getattr(klass, '__slots__', ())
+            if not slot.startswith('_')}
+
+
 class DummyBaseForm(BaseForm):
     def __init__(self, name: str = None, items: Dict[str, str] = None):
         self.name = name
@@ -43,3 +59,160 @@ def test_base_form_correctly_resolves_dict(dummy_form: FormTestFixture):
     actual_form = dummy_form.value.dict()
     expected_form = dummy_form.dict
     assert actual_form == expected_form
+
+
+def test_base_form_removes_nested_dicts_that_are_empty_after_cleaning():
+    actual_form = DummyBaseForm(name='test', items={'test': None}).dict()
+    expected_form = {'name': 'test'}
+    assert actual_form == expected_form
+
+
+def test_base_form_does_not_modify_nested_dicts():
+    items = {'test': 'test', 'empty': ''}
+    actual_form = DummyBaseForm(items=items).dict()
+    assert actual_form == {'items': {'test': 'test'}}
+    assert items == {'test': 'test', 'empty': ''}
+
+
+def test_base_form_keeps_values_without_length():
+    class NumberForm(BaseForm):
+        def _dict(self):
+            return {'number': 0, 'flag': False}
+
+    assert NumberForm().dict() == {'number': 0, 'flag': False}
+
+
+def test_base_form_rebuilds_dict_when_attribute_is_reassigned():
+    form = DummyBaseForm(name='test')
+    assert form.dict() is form.dict()
+
+    form.name = 'updated'
+    assert form.dict() == {'name': 'updated'}
+
+
+def test_base_form_rebuilds_dict_when_mutable_attribute_is_modified_in_place():
+    form = DummyBaseForm(items={'test': 'test', 'empty': ''})
+    form.dict()
+
+    form.items['other'] = 'other'
+    assert form.dict() == {'items': {'test': 'test', 'other': 'other'}}
+
+
+class DummyFieldsForm(BaseForm):
+    __slots__ = ('name', 'items', 'count')
+    _FIELDS = (
+        ('name', 'name', str.upper),
+        ('items', 'items', None),
+        ('count', 'count', None)
+    )
+
+    def __init__(self, name: str = None, items: Dict[str, str] = None, count: int = None):
+        self.name = name
+        self.items = items
+        self.count = count
+
+
+def test_fields_form_generates_dict_methods():
+    form = DummyFieldsForm(name='test', items={'test': 'test', 'empty': ''}, count=0)
+    assert form._dict() == {'name': 'TEST', 'items': {'test': 'test', 'empty': ''}, 'count': 0}
+    assert form.dict() == {'name': 'TEST', 'items': {'test': 'test'}, 'count': 0}
+
+
+def test_fields_form_removes_missing_and_empty_values():
+    form = DummyFieldsForm(name='test', items={'empty': None})
+    assert form.dict() == {'name': 'TEST'}
+
+
+def test_chunked_splits_items_into_chunks_of_given_size():
+    assert list(core.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_map_concurrently_returns_results_in_order_of_given_items():
+    assert core.map_concurrently(lambda item: item * 2, range(20), max_workers=4) == [item * 2 for item in range(20)]
+
+
+def test_default_client_is_only_constructed_once_per_service(mocker):
+    mocker.patch.object(core, '_default_clients', {})
+    mock_session = mocker.patch.object(core, '_session')
+    mock_session.client.side_effect = lambda service_name, config: mocker.Mock()
+
+    assert core.default_client('kms') is core.default_client('kms')
+    assert core.default_client('ses') is not core.default_client('kms')
+
+    mock_session.client.assert_has_calls([
+        mocker.call('kms', config=core._SERVICE_CLIENT_CONFIGS['kms']),
+        mocker.call('ses', config=core.DEFAULT_CLIENT_CONFIG)
+    ])
+    assert mock_session.client.call_count == 2
+
+
+def test_create_client_merges_given_config_with_default_config(mocker):
+    mock_session = mocker.patch.object(core, '_session')
+
+    core.create_client('kms', Config(read_timeout=5))
+
+    config = mock_session.client.call_args.kwargs['config']
+    assert config.read_timeout == 5
+    assert config.max_pool_connections == core.DEFAULT_CLIENT_CONFIG.max_pool_connections
+    assert config.tcp_keepalive
+
+
+@pytest.mark.parametrize('service_name,read_timeout', [
+    ('kms', 1),
+    ('ses', 60),
+    ('sns', 60)
+])
+def test_create_client_only_uses_short_read_timeout_for_services_safe_to_retry(mocker,
+                                                                               service_name: str,
+                                                                               read_timeout: int):
+    mock_session = mocker.patch.object(core, '_session')
+
+    core.create_client(service_name)
+
+    config = mock_session.client.call_args.kwargs['config']
+    assert config.read_timeout == read_timeout
+    assert config.connect_timeout == core.DEFAULT_CLIENT_CONFIG.connect_timeout
+
+
+@pytest.mark.parametrize('environ,region', [
+    ({'AWS_REGION': 'eu-west-1', 'AWS_DEFAULT_REGION': 'eu-west-2'}, 'eu-west-1'),
+    ({'AWS_DEFAULT_REGION': 'eu-west-2'}, 'eu-west-2')
+], ids=['aws_region', 'aws_default_region'])
+def test_default_client_config_uses_region_from_environment(environ: Dict[str, str], region: str):
+    env = {key: value for key, value in os.environ.items() if key not in ('AWS_REGION', 'AWS_DEFAULT_REGION')}
+    env.update(environ)
+    code = 'from pyocle.service import core; print(core.DEFAULT_CLIENT_CONFIG.region_name, end="")'
+    result = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parents[2], env=env,
+                            stdout=subprocess.PIPE, check=True)
+    assert result.stdout.decode() == region
+
+
+def test_create_client_passes_default_region(mocker):
+    mocker.patch.object(core, 'DEFAULT_CLIENT_CONFIG', Config(region_name='ap-south-1'))
+    mock_session = mocker.patch.object(core, '_session')
+
+    core.create_client('ses')
+
+    assert mock_session.client.call_args.kwargs['config'].region_name == 'ap-south-1'
+
+
+def test_create_client_given_config_region_overrides_default_region(mocker):
+    mock_session = mocker.patch.object(core, '_session')
+
+    core.create_client('kms', Config(region_name='eu-west-1'))
+
+    assert mock_session.client.call_args.kwargs['config'].region_name == 'eu-west-1'
+
+
+def test_importing_pyocle_does_not_import_boto3():
+    result = subprocess.run([sys.executable, '-c', 'import sys, pyocle; sys.exit("boto3" in sys.modules)'],
+                            cwd=Path(__file__).parents[2])
+    assert result.returncode == 0
+
+
+def test_async_client_raises_import_error_when_aioboto3_is_not_installed(mocker):
+    mocker.patch.object(core, '_async_session', None)
+    mocker.patch.dict(sys.modules, {'aioboto3': None})
+
+    with pytest.raises(ImportError):
+        core.async_client('kms')
@@ -1,9 +1,12 @@
+import asyncio
 import base64
+import sys
 
 import boto3
 import pytest
 
-from pyocle.service.kms import EncryptForm, EncryptionAlgorithm, DecryptForm, KeyManagementService
+from pyocle.service.kms import EncryptForm, EncryptionAlgorithm, DecryptForm, KeyManagementService, \
+    GenerateDataKeyForm, DataKeySpec, CachingKeyManagementService
 from tests.service.test_core import FormTestFixture
 
 
@@ -61,12 +64,29 @@ def test_encrypt_form_is_correctly_converted_to_dict(encrypt_form: FormTestFixtu
     assert actual_dict == expected_dict
 
 
+def test_encrypt_form_subclass_overriding_dict_is_converted_with_its_own_dict():
+    class OverriddenEncryptForm(EncryptForm):
+        def _dict(self):
+            form_dict = super()._dict()
+            form_dict['KeyId'] = 'overridden'
+            return form_dict
+
+    form = OverriddenEncryptForm(key_id='key id', plain_text='plain text')
+    assert form.dict() == {'KeyId': 'overridden', 'Plaintext': 'plain text'}
+
+
 def test_decrypt_form_is_correctly_converted_to_dict(decrypt_form: FormTestFixture):
     actual_dict = decrypt_form.value.dict()
     expected_dict = decrypt_form.dict
     assert actual_dict == expected_dict
 
 
+def test_encrypt_form_accepts_encryption_algorithm_as_string():
+    form = EncryptForm(key_id='key id', plain_text='plain', encryption_algorithm='RSAES_OAEP_SHA_1')
+    assert form.encryption_algorithm == 'RSAES_OAEP_SHA_1'
+    assert form.dict()['EncryptionAlgorithm'] == 'RSAES_OAEP_SHA_1'
+
+
 def test_decrypt_form_is_correctly_converted_to_dict_with_bytes_cipher_text(decrypt_form: FormTestFixture):
     blob = base64.b64decode('test')
     decrypt_form.value.cipher_text_blob = blob
@@ -76,6 +96,31 @@ def test_decrypt_form_is_correctly_converted_to_dict_with_bytes_cipher_text(decr
     assert actual_dict == expected_dict
 
 
+def test_decrypt_form_does_not_copy_binary_cipher_text(decrypt_form: FormTestFixture):
+    blob = base64.b64decode('test')
+    decrypt_form.value.cipher_text_blob = blob
+    assert decrypt_form.value.dict()['CiphertextBlob'] is blob
+
+
+def test_decrypt_form_converts_memoryview_cipher_text_to_bytes(decrypt_form: FormTestFixture):
+    blob = base64.b64decode('test')
+    decrypt_form.value.cipher_text_blob = memoryview(blob)
+    actual_blob = decrypt_form.value.dict()['CiphertextBlob']
+    assert type(actual_blob) is bytes
+    assert actual_blob == blob
+
+
+def test_decrypt_form_does_not_construct_client_when_converted_to_dict(mocker, decrypt_form: FormTestFixture):
+    mock_boto3_client = mocker.patch('boto3.client')
+    mock_default_client = mocker.patch('pyocle.service.kms.default_client')
+    mock_create_client = mocker.patch('pyocle.service.kms.create_client')
+    decrypt_form.value.dict()
+
+    mock_boto3_client.assert_not_called()
+    mock_default_client.assert_not_called()
+    mock_create_client.assert_not_called()
+
+
 def test_key_management_service_invokes_client_encrypt_operation_correctly(mocker, encrypt_form: FormTestFixture):
     mock_client = mocker.patch.object(boto3.client('kms'), 'encrypt')
     kms = KeyManagementService(mock_client)
@@ -92,3 +137,108 @@ def test_key_management_service_invokes_client_decrypt_operation_correctly(mocke
 
     mock_client.decrypt.assert_called_once()
     mock_client.decrypt.assert_called_with(**decrypt_form.dict)
+
+
+def test_key_management_service_invokes_async_client_encrypt_operation_correctly(
+        mocker,
+        encrypt_form: FormTestFixture):
+    mock_client = mocker.AsyncMock()
+    mock_async_client = mocker.patch('pyocle.service.kms.async_client')
+    mock_async_client.return_value.__aenter__.return_value = mock_client
+    kms = KeyManagementService(mocker.Mock())
+    asyncio.run(kms.aencrypt(encrypt_form.value))
+
+    mock_async_client.assert_called_once_with('kms', None)
+    mock_client.encrypt.assert_awaited_once_with(**encrypt_form.dict)
+
+
+def test_key_management_service_decrypts_many_forms(mocker, decrypt_form: FormTestFixture):
+    mock_client = mocker.Mock()
+    kms = KeyManagementService(mock_client)
+    kms.decrypt_many([decrypt_form.value] * 3)
+
+    assert mock_client.decrypt.call_count == 3
+    mock_client.decrypt.assert_called_with(**decrypt_form.dict)
+
+
+def test_generate_data_key_form_is_correctly_converted_to_dict():
+    form = GenerateDataKeyForm(key_id='key id', encryption_context={'test': 'context'}, key_spec=DataKeySpec.AES_256)
+    assert form.dict() == {'KeyId': 'key id', 'EncryptionContext': {'test': 'context'}, 'KeySpec': 'AES_256'}
+
+
+@pytest.fixture
+def caching_kms(mocker):
+    pytest.importorskip('cryptography')
+    kms = mocker.Mock()
+    kms.generate_data_key.return_value = {'Plaintext': b'k' * 32, 'CiphertextBlob': b'encrypted key'}
+    kms.decrypt.return_value = {'Plaintext': b'k' * 32}
+    return kms
+
+
+def test_caching_key_management_service_reuses_data_key(caching_kms):
+    service = CachingKeyManagementService(caching_kms)
+    first_message = service.encrypt('key id', 'plain', {'test': 'context'})
+    second_message = service.encrypt('key id', 'plain', {'test': 'context'})
+
+    assert first_message != second_message
+    assert service.decrypt(first_message, {'test': 'context'}) == b'plain'
+    assert service.decrypt(second_message, {'test': 'context'}) == b'plain'
+    caching_kms.generate_data_key.assert_called_once()
+    caching_kms.decrypt.assert_not_called()
+
+
+def test_caching_key_management_service_generates_new_data_key_after_max_messages(caching_kms):
+    service = CachingKeyManagementService(caching_kms, max_messages_per_key=2)
+    for _ in range(3):
+        service.encrypt('key id', b'plain')
+
+    assert caching_kms.generate_data_key.call_count == 2
+
+
+def test_caching_key_management_service_raises_import_error_when_cryptography_is_not_installed(mocker):
+    mocker.patch.dict(sys.modules, {'cryptography.hazmat.primitives.ciphers.aead': None})
+
+    with pytest.raises(ImportError):
+        CachingKeyManagementService(mocker.Mock())
+
+
+def test_caching_key_management_service_decrypts_data_key_once_when_not_cached(caching_kms):
+    message = CachingKeyManagementService(caching_kms).encrypt('key id', b'plain')
+    service = CachingKeyManagementService(caching_kms)
+
+    assert service.decrypt(message) == b'plain'
+    assert service.decrypt(message) == b'plain'
+    caching_kms.decrypt.assert_called_once()
+
+
+def test_caching_key_management_service_rejects_wrong_encryption_context(caching_kms):
+    service = CachingKeyManagementService(caching_kms)
+    message = service.encrypt('key id', b'plain', {'test': 'context'})
+
+    from cryptography.exceptions import InvalidTag
+    with pytest.raises(InvalidTag):
+        service.decrypt(message, {'test': 'other'})
+
+
+@pytest.mark.parametrize('length', [0, 2, 10, 20, -1],
+                         ids=['empty', 'partial_header', 'partial_key', 'partial_nonce', 'partial_tag'])
+def test_caching_key_management_service_rejects_truncated_message(caching_kms, length: int):
+    service = CachingKeyManagementService(caching_kms)
+    message = service.encrypt('key id', b'')
+
+    with pytest.raises(ValueError):
+        service.decrypt(message[:length])
+
+
+def test_caching_key_management_service_generates_new_data_key_once_cached_key_expires(mocker, caching_kms):
+    monotonic = mocker.patch('pyocle.service.kms.time.monotonic', return_value=0)
+    service = CachingKeyManagementService(caching_kms, max_age=300)
+    service.encrypt('key id', b'plain')
+
+    monotonic.return_value = 299
+    service.encrypt('key id', b'plain')
+    assert caching_kms.generate_data_key.call_count == 1
+
+    monotonic.return_value = 300
+    service.encrypt('key id', b'plain')
+    assert caching_kms.generate_data_key.call_count == 2
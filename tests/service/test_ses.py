@@ -2,7 +2,7 @@ import boto3
 import pytest
 
 from pyocle.service.ses import EmailForm, TemplatedEmailForm, BaseEmailForm, SimpleEmailService, EmailTag
-from tests.service.test_core import FormTestFixture
+from tests.service.test_core import FormTestFixture, form_kwargs
 
 
 @pytest.fixture
@@ -61,7 +61,7 @@ def email_form(base_email_form: FormTestFixture) -> FormTestFixture:
             subject='subject',
             text='text',
             html='html',
-            **base_email_form.value.__dict__
+            **form_kwargs(base_email_form.value)
         ),
         dict={
             'Source': 'source',
@@ -109,7 +109,7 @@ def templated_email_form(base_email_form: FormTestFixture) -> FormTestFixture:
             template_data={
                 'template': 'data'
             },
-            **base_email_form.value.__dict__
+            **form_kwargs(base_email_form.value)
         ),
         dict={
             'Source': 'source',
@@ -130,17 +130,51 @@ def templated_email_form(base_email_form: FormTestFixture) -> FormTestFixture:
             ],
             'ConfigurationSetName': 'configuration set',
             'Template': 'template',
-            'TemplateData': '{"template": "data"}'
+            'TemplateData': '{"template":"data"}'
         }
     )
 
 
+def test_email_forms_do_not_carry_instance_dict(email_form: FormTestFixture, templated_email_form: FormTestFixture):
+    assert not hasattr(email_form.value, '__dict__')
+    assert not hasattr(templated_email_form.value, '__dict__')
+
+
 def test_email_tag_is_correctly_converted_to_dict(email_tag: FormTestFixture):
     actual_dict = email_tag.value.dict()
     expected_dict = email_tag.dict
     assert actual_dict == expected_dict
 
 
+def test_email_tag_dict_is_updated_when_value_changes(email_tag: FormTestFixture):
+    email_tag.value.value = 'updated'
+    assert email_tag.value.dict() == {'Name': 'name', 'Value': 'updated'}
+
+
+def test_email_form_dict_reflects_addresses_appended_after_conversion():
+    form = EmailForm(source='source', to_addresses=['to'], subject='subject', text='text')
+    form.dict()
+
+    form.cc_addresses.append('cc')
+    assert form.dict()['Destination']['CcAddresses'] == ['cc']
+
+
+def test_email_form_dict_reflects_tags_appended_after_conversion(email_tag: FormTestFixture):
+    form = EmailForm(source='source', to_addresses=['to'], subject='subject', text='text')
+    form.dict()
+
+    form.tags.append(email_tag.value)
+    assert form.dict()['Tags'] == [email_tag.dict]
+
+
+def test_email_form_dict_reflects_tag_value_changed_after_conversion(email_form: FormTestFixture):
+    form = email_form.value
+    form.dict()
+
+    form.tags[0].value = 'updated'
+    assert form.dict()['Tags'] == [{'Name': 'name', 'Value': 'updated'}]
+
+
 def test_email_form_raises_value_error_when_text_or_html_is_not_provided():
     with pytest.raises(ValueError) as ex_info:
         EmailForm(
@@ -173,12 +207,17 @@ def test_templated_email_form_is_correctly_converted_to_dict(templated_email_for
 
 def test_templated_email_form_is_correctly_converted_to_dict_with_string_template_data(
         templated_email_form: FormTestFixture):
-    templated_email_form.value.template_data = '{"template": "data"}'
+    templated_email_form.value.template_data = '{"template":"data"}'
     actual_dict = templated_email_form.value.dict()
     expected_dict = templated_email_form.dict
     assert actual_dict == expected_dict
 
 
+def test_templated_email_form_converts_non_string_template_data_keys(templated_email_form: FormTestFixture):
+    templated_email_form.value.template_data = {1: 'a'}
+    assert templated_email_form.value.dict()['TemplateData'] == '{"1":"a"}'
+
+
 def test_simple_email_service_invokes_client_send_email_operation_correctly(
         mocker,
         email_form: FormTestFixture):
@@ -199,3 +238,46 @@ def test_simple_email_service_invokes_client_send_templated_email_operation_corr
 
     mock_client.send_templated_email.assert_called_once()
     mock_client.send_templated_email.assert_called_with(**templated_email_form.dict)
+
+
+def test_simple_email_service_sends_many_emails(mocker, email_form: FormTestFixture):
+    mock_client = mocker.Mock()
+    ses = SimpleEmailService(mock_client)
+    ses.send_email_many([email_form.value] * 3)
+
+    assert mock_client.send_email.call_count == 3
+    mock_client.send_email.assert_called_with(**email_form.dict)
+
+
+def test_simple_email_service_sends_templated_emails_in_bulk(mocker):
+    mock_client = mocker.Mock()
+    ses = SimpleEmailService(mock_client)
+    forms = [
+        TemplatedEmailForm(source='source', to_addresses=[address], template='template', template_data=data)
+        for address, data in [('first', '{"name": "first"}'), ('second', '{"name": "second"}')]
+    ]
+    ses.send_bulk_templated_email(forms)
+
+    mock_client.send_bulk_templated_email.assert_called_once_with(
+        Source='source',
+        Template='template',
+        DefaultTemplateData='{}',
+        Destinations=[
+            {'Destination': {'ToAddresses': ['first']}, 'ReplacementTemplateData': '{"name": "first"}'},
+            {'Destination': {'ToAddresses': ['second']}, 'ReplacementTemplateData': '{"name": "second"}'}
+        ]
+    )
+
+
+def test_simple_email_service_raises_value_error_when_bulk_emails_differ(mocker):
+    mock_client = mocker.Mock()
+    ses = SimpleEmailService(mock_client)
+    forms = [
+        TemplatedEmailForm(source='source', to_addresses=['to'], template=template, template_data='{}')
+        for template in ['first', 'second']
+    ]
+
+    with pytest.raises(ValueError):
+        ses.send_bulk_templated_email(forms)
+
+    mock_client.send_bulk_templated_email.assert_not_called()
@@ -1,12 +1,25 @@
-import boto3
+from typing import Callable
+from unittest.mock import MagicMock
+
 import pytest
 
 from pyocle.service.sns import MessageAttribute, PublishMessageForm, SimpleNotificationService
 from tests.service.test_core import FormTestFixture
 
+FormTestFixtureFactory = Callable[[], FormTestFixture]
+
+
+@pytest.fixture(scope='module')
+def sns_client() -> MagicMock:
+    return MagicMock()
+
+
+@pytest.fixture(autouse=True)
+def reset_sns_client(sns_client: MagicMock):
+    sns_client.reset_mock(side_effect=True)
 
-@pytest.fixture
-def message_attribute() -> FormTestFixture:
+
+def _message_attribute() -> FormTestFixture:
     return FormTestFixture(
         value=MessageAttribute(
             data_type='data type',
@@ -21,8 +34,8 @@ def message_attribute() -> FormTestFixture:
     )
 
 
-@pytest.fixture
-def publish_message(message_attribute: FormTestFixture) -> FormTestFixture:
+def _publish_message() -> FormTestFixture:
+    message_attribute = _message_attribute()
     return FormTestFixture(
         value=PublishMessageForm(
             message='message',
@@ -48,30 +61,82 @@ def publish_message(message_attribute: FormTestFixture) -> FormTestFixture:
     )
 
 
-def test_message_attribute_is_correctly_converted_to_dict(message_attribute: FormTestFixture):
-    actual_dict = message_attribute.value.dict()
-    expected_dict = message_attribute.dict
-    assert actual_dict == expected_dict
+@pytest.fixture(scope='module')
+def message_attribute() -> FormTestFixtureFactory:
+    """
+    Factory building a new message attribute and its expected dict on every call
+    """
+    return _message_attribute
 
 
-def test_publish_message_form_is_correctly_converted_to_dict(publish_message: FormTestFixture):
-    actual_dict = publish_message.value.dict()
-    expected_dict = publish_message.dict
-    assert actual_dict == expected_dict
+@pytest.fixture(scope='module')
+def publish_message() -> FormTestFixtureFactory:
+    """
+    Factory building a new publish message form and its expected dict on every call
+    """
+    return _publish_message
+
 
+def test_message_attribute_is_correctly_converted_to_dict(message_attribute: FormTestFixtureFactory):
+    fixture = message_attribute()
+    assert fixture.value.dict() == fixture.dict
 
-def test_publish_message_form_is_correctly_converted_to_dict_with_dict_message(publish_message: FormTestFixture):
-    publish_message.value.message = {
+
+def test_publish_message_form_is_correctly_converted_to_dict(publish_message: FormTestFixtureFactory):
+    fixture = publish_message()
+    assert fixture.value.dict() == fixture.dict
+
+
+def test_publish_message_form_is_correctly_converted_to_dict_with_dict_message(publish_message: FormTestFixtureFactory):
+    fixture = publish_message()
+    fixture.value.message = {
         'key': 'value'
     }
-    actual_dict = publish_message.value.dict()
-    expected_dict = publish_message.dict
+    actual_dict = fixture.value.dict()
+    expected_dict = fixture.dict
     expected_dict.update({
-        'Message': '{"key": "value"}'
+        'Message': '{"key":"value"}'
     })
     assert actual_dict == expected_dict
 
 
+def test_publish_message_form_converts_non_string_message_keys(publish_message: FormTestFixtureFactory):
+    fixture = publish_message()
+    fixture.value.message = {1: 'a'}
+    assert fixture.value.dict()['Message'] == '{"1":"a"}'
+
+
+def test_publish_message_form_message_attributes_are_read_only(publish_message: FormTestFixtureFactory):
+    with pytest.raises(TypeError):
+        publish_message().value.message_attributes['other'] = MessageAttribute(data_type='String')
+
+
+def test_publish_message_form_converts_message_attributes_when_reassigned(publish_message: FormTestFixtureFactory):
+    fixture = publish_message()
+    fixture.value.message_attributes = {'other': MessageAttribute(data_type='String', string_value='value')}
+    expected_dict = fixture.dict
+    expected_dict['MessageAttributes'] = {'other': {'DataType': 'String', 'StringValue': 'value'}}
+    assert fixture.value.dict() == expected_dict
+
+
+def test_publish_message_form_reflects_message_attribute_changes(publish_message: FormTestFixtureFactory):
+    fixture = publish_message()
+    fixture.value.dict()
+
+    fixture.value.message_attributes['key'].string_value = 'updated'
+    assert fixture.value.dict()['MessageAttributes']['key']['StringValue'] == 'updated'
+
+
+def test_publish_message_form_removes_message_attributes_when_reassigned_to_none(
+        publish_message: FormTestFixtureFactory):
+    fixture = publish_message()
+    fixture.value.message_attributes = None
+
+    expected_dict = fixture.dict
+    del expected_dict['MessageAttributes']
+    assert fixture.value.dict() == expected_dict
+
+
 def test_publish_message_form_raises_value_error_when_phone_target_or_topic_is_not_provided():
     with pytest.raises(ValueError) as ex_info:
         PublishMessageForm(
@@ -83,11 +148,47 @@ def test_publish_message_form_raises_value_error_when_phone_target_or_topic_is_n
 
 
 def test_simple_notification_service_invokes_publish_operation_correctly(
-        mocker,
-        publish_message: FormTestFixture):
-    mock_client = mocker.patch.object(boto3.client('sns'), 'publish')
-    sns = SimpleNotificationService(mock_client)
-    sns.publish(publish_message.value)
-
-    mock_client.publish.assert_called_once()
-    mock_client.publish.assert_called_with(**publish_message.dict)
+        sns_client: MagicMock,
+        publish_message: FormTestFixtureFactory):
+    fixture = publish_message()
+    sns = SimpleNotificationService(sns_client)
+    sns.publish(fixture.value)
+
+    sns_client.publish.assert_called_once()
+    sns_client.publish.assert_called_with(**fixture.dict)
+
+
+def test_simple_notification_service_publishes_batches_of_ten_messages_per_topic(sns_client: MagicMock):
+    sns = SimpleNotificationService(sns_client)
+    forms = [PublishMessageForm(message=str(index), topic_arn='topic arn') for index in range(11)]
+    sns.publish_batch(forms)
+
+    assert sns_client.publish_batch.call_count == 2
+    first_call, second_call = sns_client.publish_batch.call_args_list
+    assert first_call.kwargs['TopicArn'] == 'topic arn'
+    assert len(first_call.kwargs['PublishBatchRequestEntries']) == 10
+    assert first_call.kwargs['PublishBatchRequestEntries'][0] == {'Id': '0', 'Message': '0'}
+    assert second_call.kwargs['PublishBatchRequestEntries'] == [{'Id': '0', 'Message': '10'}]
+
+
+def test_simple_notification_service_publishes_many_messages(sns_client: MagicMock):
+    sns_client.publish.side_effect = lambda **kwargs: kwargs['Message']
+    sns = SimpleNotificationService(sns_client)
+    forms = [PublishMessageForm(message=str(index), phone_number='phone number') for index in range(5)]
+
+    assert sns.publish_many(forms) == ['0', '1', '2', '3', '4']
+    assert sns_client.publish.call_count == 5
+
+
+def test_simple_notification_service_raises_value_error_when_batching_messages_without_topic(sns_client: MagicMock):
+    sns = SimpleNotificationService(sns_client)
+    with pytest.raises(ValueError):
+        sns.publish_batch([PublishMessageForm(message='message', phone_number='phone number')])
+
+
+def test_simple_notification_service_raises_value_error_when_batching_messages_with_target(sns_client: MagicMock):
+    sns = SimpleNotificationService(sns_client)
+    with pytest.raises(ValueError):
+        sns.publish_batch([PublishMessageForm(message='message', topic_arn='topic arn', target_arn='target arn')])
+
+    sns_client.publish_batch.assert_not_called()
@@ -1,62 +1,88 @@
+from functools import partial
+
 import pytest
 
 import pyocle
-from pyocle.config import MissingEnvironmentVariableError
+from pyocle.config import MissingEnvironmentVariableError, env_var, encrypted_env_var
+
+
+def _decrypter(value):
+    """Dummy decrypter so that we do not trigger the kms decrypter"""
+    return value
 
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def env():
     return {
         'CONNECTION_STRING': 'connect'
     }
 
 
-def test_env_var_is_retrieved_correctly(env):
-    environment_variable = pyocle.config.env_var('CONNECTION_STRING', environment=env)
-    assert environment_variable is not None
-    assert environment_variable == 'connect'
-
-
-def test_env_var_returns_default_when_variable_is_missing(env):
-    default = 'default'
-    environment_variable = pyocle.config.env_var('does not exist', default=default, environment=env)
-    assert environment_variable is not None
-    assert environment_variable == default
+@pytest.mark.parametrize('resolver,name,default,expected', [
+    (env_var, 'CONNECTION_STRING', None, 'connect'),
+    (env_var, 'does not exist', 'default', 'default'),
+    (partial(encrypted_env_var, decrypter=_decrypter), 'CONNECTION_STRING', None, 'connect'),
+    (partial(encrypted_env_var, decrypter=_decrypter), 'does not exist', 'default', 'default')
+], ids=['env_var', 'env_var_default', 'encrypted_env_var', 'encrypted_env_var_default'])
+def test_env_var_is_retrieved_correctly(env, resolver, name: str, default: str, expected: str):
+    environment_variable = resolver(name, default=default, environment=env)
+    assert environment_variable == expected
 
 
-def test_env_var_raises_error_when_variable_does_not_exist(env):
+@pytest.mark.parametrize('resolver', [
+    env_var,
+    partial(encrypted_env_var, decrypter=_decrypter)
+], ids=['env_var', 'encrypted_env_var'])
+def test_env_var_raises_error_when_variable_does_not_exist(env, resolver):
     missing_variable = 'does not exist'
     with pytest.raises(MissingEnvironmentVariableError) as exception_info:
-        pyocle.config.env_var(missing_variable, environment=env)
+        resolver(missing_variable, environment=env)
 
     exception = exception_info.value
     assert exception.env_var_name == missing_variable
     assert str(exception) == f'An environment variable with the name: {missing_variable} could not be found.'
 
 
-def test_encrypted_env_var_returns_default_when_variable_is_missing(env):
+def test_env_var_reads_changes_to_os_environment(monkeypatch):
+    monkeypatch.setenv('PYOCLE_TEST_VARIABLE', 'value')
+    assert pyocle.config.env_var('PYOCLE_TEST_VARIABLE') == 'value'
+
+    monkeypatch.setenv('PYOCLE_TEST_VARIABLE', 'changed')
+    assert pyocle.config.env_var('PYOCLE_TEST_VARIABLE') == 'changed'
+
+    monkeypatch.delenv('PYOCLE_TEST_VARIABLE')
+    assert pyocle.config.env_var('PYOCLE_TEST_VARIABLE', default='default') == 'default'
+
+
+def test_encrypted_env_var_skips_decryption_of_plaintext_values():
     def decrypter(value):
-        """Dummy decrypter so that we do not trigger the kms decrypter"""
-        return value
+        raise AssertionError('Plaintext values should not be decrypted')
 
-    default = 'default'
-    environment_variable = pyocle.config.encrypted_env_var('does not exist',
-                                                           default=default,
+    environment_variable = pyocle.config.encrypted_env_var('CONNECTION_STRING',
                                                            decrypter=decrypter,
-                                                           environment=env)
-    assert environment_variable is not None
-    assert environment_variable == default
+                                                           environment={'CONNECTION_STRING': 'plain:connect'})
+    assert environment_variable == 'connect'
 
 
-def test_encrypted_env_var_raises_error_when_variable_is_missing_and_no_default_provided(env):
-    def decrypter(value):
-        """Dummy decrypter so that we do not trigger the kms decrypter"""
-        return value
+def test_kms_decrypter_reuses_service_and_caches_decrypted_values(mocker):
+    mock_service = mocker.patch('pyocle.config.KeyManagementService')
+    mock_service.return_value.decrypt.return_value = {'Plaintext': b'plain'}
+    mocker.patch.object(pyocle.config, '_kms_client', None)
+    pyocle.config._kms_decrypter.cache_clear()
 
-    missing_variable = 'does not exist'
-    with pytest.raises(MissingEnvironmentVariableError) as exception_info:
-        pyocle.config.encrypted_env_var(missing_variable, decrypter=decrypter, environment=env)
+    assert pyocle.config._kms_decrypter('dGVzdA==') == 'plain'
+    assert pyocle.config._kms_decrypter('dGVzdA==') == 'plain'
 
-    exception = exception_info.value
-    assert exception.env_var_name == missing_variable
-    assert str(exception) == f'An environment variable with the name: {missing_variable} could not be found.'
+    mock_service.assert_called_once()
+    mock_service.return_value.decrypt.assert_called_once()
+    pyocle.config._kms_decrypter.cache_clear()
+
+
+def test_warmup_kms_constructs_service_once(mocker):
+    mock_service = mocker.patch('pyocle.config.KeyManagementService')
+    mocker.patch.object(pyocle.config, '_kms_client', None)
+
+    pyocle.config.warmup_kms()
+    pyocle.config.warmup_kms()
+
+    mock_service.assert_called_once()
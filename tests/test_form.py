@@ -1,36 +1,32 @@
-import copy
-from typing import Dict, Any, Optional, Type
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Mapping
 
-import jsonpickle
+import orjson
 import pytest
 from pydantic import BaseModel, ValidationError
 
-from pyocle.form import resolve_form, PaginationQueryParameters, FormValidationError, resolve_query_params
+from pyocle.form import resolve_form, PaginationQueryParameters, FormValidationError, resolve_query_params, \
+    try_resolve_form
+from tests.conftest import DummyForm
 
 
-@pytest.fixture
-def dummy_form() -> Dict[str, Any]:
-    valid_form = {
+@pytest.fixture(scope='module')
+def dummy_form() -> Mapping[str, Any]:
+    # Shared by every test in the module, so tests may not modify it
+    return MappingProxyType({
         'first_name': 'first',
         'last_name': 'last'
-    }
+    })
 
-    return copy.deepcopy(valid_form)
 
+@pytest.fixture(scope='module')
+def valid_form_json(valid_form_bytes) -> str:
+    return valid_form_bytes.decode()
 
-@pytest.fixture
-def valid_form_json(dummy_form) -> str:
-    return jsonpickle.dumps(dummy_form, unpicklable=False)
 
-
-@pytest.fixture
-def valid_form_bytes(valid_form_json) -> bytes:
-    return bytes(valid_form_json, 'utf-8')
-
-
-class DummyForm(BaseModel):
-    first_name: str
-    last_name: str
+@pytest.fixture(scope='module')
+def valid_form_bytes(dummy_form) -> bytes:
+    return orjson.dumps(dict(dummy_form))
 
 
 class TestResolveForm:
@@ -51,7 +47,7 @@ class TestResolveForm:
         '',
         '{',
         '123'
-    ])
+    ], ids=['none', 'empty', 'brace', 'int'])
     def test_raises_form_validation_error_when_given_invalid_or_no_json(self, data):
         with pytest.raises(FormValidationError) as exception_info:
             resolve_form(data, DummyForm)
@@ -72,6 +68,23 @@ class TestResolveForm:
         assert expected_message in str(exception_info.value)
 
 
+class TestTryResolveForm:
+    def test_returns_form_when_form_is_valid(self, dummy_form):
+        resolved_dummy_form, error = try_resolve_form(dummy_form, DummyForm)
+        assert resolved_dummy_form == DummyForm(**dummy_form)
+        assert error is None
+
+    @pytest.mark.parametrize('data', [
+        {'first_name': 'first'},
+        '{'
+    ])
+    def test_returns_error_when_form_is_invalid(self, data):
+        resolved_dummy_form, error = try_resolve_form(data, DummyForm)
+        assert resolved_dummy_form is None
+        assert isinstance(error, FormValidationError)
+        assert error.schemas == {'requestBody': DummyForm.schema()}
+
+
 class TestPaginationQueryParameters:
     @pytest.mark.parametrize('page,limit', [
         (0, 10),
@@ -96,26 +109,52 @@ class TestPaginationQueryParameters:
             PaginationQueryParameters(page=page, limit=limit)
 
 
-@pytest.mark.parametrize('query_params,expected,model', [
+@pytest.mark.parametrize('query_params,expected', [
     (None,
-     PaginationQueryParameters(),
-     PaginationQueryParameters),
+     PaginationQueryParameters.construct()),
+    ({},
+     PaginationQueryParameters.construct()),
     ({
          'page': 1,
          'limit': 100
      },
-     PaginationQueryParameters(page=1, limit=100),
-     PaginationQueryParameters),
+     PaginationQueryParameters.construct(page=1, limit=100)),
     ({
          'page': 5,
          'limit': 500,
          'extra': 'should be ignored'
      },
-     PaginationQueryParameters(page=5, limit=500),
-     PaginationQueryParameters)
+     PaginationQueryParameters.construct(page=5, limit=500))
 ])
-def test_resolve_query_params(query_params: Optional[Dict[str, Any]],
-                              expected: PaginationQueryParameters,
-                              model: Type[BaseModel]):
-    resolved_query_params = resolve_query_params(query_params, model)
+def test_resolve_query_params(query_params: Optional[Dict[str, Any]], expected: PaginationQueryParameters):
+    resolved_query_params = resolve_query_params(query_params, PaginationQueryParameters)
     assert resolved_query_params == expected
+
+
+def test_schema_is_only_built_once_per_form_type(mocker):
+    class CachedSchemaForm(BaseModel):
+        name: str
+
+    schema_spy = mocker.spy(CachedSchemaForm, 'schema')
+    for _ in range(2):
+        with pytest.raises(FormValidationError):
+            resolve_form({}, CachedSchemaForm)
+
+    schema_spy.assert_called_once()
+
+
+@pytest.mark.parametrize('query_params', [None, {}])
+def test_resolve_query_params_validates_empty_query_params(query_params: Optional[Dict[str, Any]]):
+    class RequiredQueryParameters(BaseModel):
+        name: str
+
+    with pytest.raises(FormValidationError):
+        resolve_query_params(query_params, RequiredQueryParameters)
+
+
+def test_resolve_query_params_does_not_share_cached_instances():
+    params = {'page': 2, 'limit': 20}
+    resolved_query_params = resolve_query_params(params, PaginationQueryParameters)
+    resolved_query_params.page = 3
+
+    assert resolve_query_params(params, PaginationQueryParameters) == PaginationQueryParameters(page=2, limit=20)
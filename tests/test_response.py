@@ -1,24 +1,46 @@
+import copy
+import pickle
+from decimal import Decimal
+
+import orjson
 import pytest
-from pydantic import BaseModel
+from chalice import Response
+
+from pyocle.form import PaginationQueryParameters, FormValidationError
+from pyocle.response import ok, created, bad, not_found, internal_error, ok_metadata, bad_metadata, \
+    not_found_metadata, internal_error_metadata, MetaData, ErrorDetail, PaginationDetails, error_handler, \
+    _build_error_details
+from pyocle.service.core import ResourceNotFoundError
+from tests.conftest import DummyForm
 
-from pyocle.response import *
-from pyocle.response import _build_error_details
 
+_SCHEMAS = {'requestBody': DummyForm.schema()}
 
-class DummyForm(BaseModel):
-    first_name: str
-    last_name: str
+_ERROR_DETAILS = [
+    ErrorDetail(description='description', location='some_field'),
+    ErrorDetail(description='description', location='test_field')
+]
 
 
-@pytest.fixture
+@pytest.fixture(scope='session')
 def schemas():
-    return {'requestBody': DummyForm.schema()}
+    return _SCHEMAS
 
 
 def test_pagination_details_ignores_unexpected_keywords():
     PaginationDetails(page=5, limit=100, unexpected='a unexpected string')
 
 
+@pytest.mark.parametrize('duplicate', [copy.copy, copy.deepcopy, lambda model: pickle.loads(pickle.dumps(model))],
+                         ids=['copy', 'deepcopy', 'pickle'])
+def test_models_can_be_copied_and_pickled(duplicate):
+    error_detail = ErrorDetail(description='description', location='some_field')
+    meta = MetaData(message='message', error_details=[error_detail], pagination_details=PaginationDetails(1, 10))
+
+    assert duplicate(error_detail) == error_detail
+    assert duplicate(meta) == meta
+
+
 class TestMetaDataBuilder:
     def test_ok(self):
         actual_meta = ok_metadata()
@@ -29,14 +51,10 @@ class TestMetaDataBuilder:
         assert actual_meta == expected_meta
 
     def test_bad(self, schemas):
-        error_details = [
-            ErrorDetail(description='description', location='some_field'),
-            ErrorDetail(description='description', location='test_field')
-        ]
-        actual_meta = bad_metadata(error_details=error_details, schemas=schemas)
+        actual_meta = bad_metadata(error_details=_ERROR_DETAILS, schemas=schemas)
         expected_meta = MetaData(
             message='Given inputs were incorrect. Consult the below details to address the issue.',
-            error_details=error_details,
+            error_details=_ERROR_DETAILS,
             schemas=schemas
         )
 
@@ -51,6 +69,10 @@ class TestMetaDataBuilder:
 
         assert actual_meta == expected_meta
 
+    def test_not_found_with_unhashable_identifier(self):
+        actual_meta = not_found_metadata(['123'])
+        assert actual_meta.message == "Resource with id ['123'] does not exist"
+
     def test_internal_error(self):
         actual_meta = internal_error_metadata()
         expected_meta = MetaData(
@@ -60,170 +82,128 @@ class TestMetaDataBuilder:
         assert actual_meta == expected_meta
 
 
-class TestResponseBuilder:
-    def test_ok(self):
-        data = {'field_name': 'field_value'}
-        res = ok(data)
-
-        actual_body = jsonpickle.loads(res.body)
-        expected_body = {
-            'success': True,
-            'meta': {
-                'message': 'Request completed successfully',
-                'errorDetails': [],
-                'paginationDetails': {},
-                'schemas': {}
-            },
-            'data': data
-        }
+_OK_MESSAGE = 'Request completed successfully'
+_BAD_MESSAGE = 'Given inputs were incorrect. Consult the below details to address the issue.'
+_INTERNAL_ERROR_MESSAGE = 'Request failed due to internal server error'
+_DATA = {'field_name': 'field_value'}
+_PAGINATION = PaginationQueryParameters(page=1, limit=50)
 
-        assert res.status_code == 200
-        assert actual_body == expected_body
-        assert res.headers == {}
 
-    def test_ok_with_pagination(self):
-        data = {'field_name': 'field_value'}
-        pagination = PaginationQueryParameters(page=1, limit=50)
-        res = ok(data, pagination)
-
-        actual_body = jsonpickle.loads(res.body)
-        expected_body = {
-            'success': True,
-            'meta': {
-                'message': 'Request completed successfully',
-                'errorDetails': [],
-                'paginationDetails': pagination.dict(),
-                'schemas': {}
-            },
-            'data': data
-        }
+def _expected_body(success: bool, message: str, data, **meta):
+    return {
+        'success': success,
+        'meta': {
+            'message': message,
+            'errorDetails': [],
+            'paginationDetails': {},
+            'schemas': {},
+            **meta
+        },
+        'data': data
+    }
 
-        assert res.status_code == 200
-        assert actual_body == expected_body
-        assert res.headers == {}
 
-    def test_created(self):
-        data = {'field_name': 'field_value'}
-        res = created(data)
-
-        actual_body = jsonpickle.loads(res.body)
-        expected_body = {
-            'success': True,
-            'meta': {
-                'message': 'Request completed successfully',
-                'errorDetails': [],
-                'paginationDetails': {},
-                'schemas': {}
-            },
-            'data': data
-        }
-
-        assert res.status_code == 201
-        assert actual_body == expected_body
+class TestResponseBuilder:
+    @pytest.mark.parametrize('builder,args,status_code,expected_body', [
+        (ok, (_DATA,), 200, _expected_body(True, _OK_MESSAGE, _DATA)),
+        (ok,
+         (_DATA, _PAGINATION),
+         200,
+         _expected_body(True, _OK_MESSAGE, _DATA, paginationDetails=_PAGINATION.dict())),
+        (created, (_DATA,), 201, _expected_body(True, _OK_MESSAGE, _DATA)),
+        (bad, (), 400, _expected_body(False, _BAD_MESSAGE, None)),
+        (not_found, ('123',), 404, _expected_body(False, 'Resource with id 123 does not exist', None)),
+        (internal_error, (), 500, _expected_body(False, _INTERNAL_ERROR_MESSAGE, None))
+    ], ids=['ok', 'ok_with_pagination', 'created', 'bad_without_details', 'not_found', 'internal_error'])
+    def test_response(self, builder, args, status_code: int, expected_body):
+        res = builder(*args)
+
+        # Bodies of these responses have a fixed shape, so the serialized body is compared as is
+        assert res.status_code == status_code
+        assert res.body == orjson.dumps(expected_body).decode()
         assert res.headers == {}
 
     def test_bad(self):
-        error_details = [
-            ErrorDetail(description='description', location='some_field'),
-            ErrorDetail(description='description', location='test_field')
-        ]
-        res = bad(error_details)
-
-        actual_body = jsonpickle.loads(res.body)
-        expected_body = {
-            'success': False,
-            'meta': {
-                'message': 'Given inputs were incorrect. Consult the below details to address the issue.',
-                'errorDetails': [
-                    {
-                        'description': 'description',
-                        'location': 'some_field'
-                    },
-                    {
-                        'description': 'description',
-                        'location': 'test_field'
-                    }
-                ],
-                'paginationDetails': {},
-                'schemas': {}
-            },
-            'data': None
-        }
+        res = bad(_ERROR_DETAILS)
+
+        actual_body = orjson.loads(res.body)
+        expected_body = _expected_body(False, _BAD_MESSAGE, None, errorDetails=[
+            {'description': 'description', 'location': 'some_field'},
+            {'description': 'description', 'location': 'test_field'}
+        ])
 
         assert res.status_code == 400
         assert actual_body == expected_body
         assert res.headers == {}
 
-    def test_not_found(self):
-        identifier = '123'
-        res = not_found(identifier)
-
-        actual_body = jsonpickle.loads(res.body)
-        expected_body = {
-            'success': False,
-            'meta': {
-                'message': 'Resource with id 123 does not exist',
-                'errorDetails': [],
-                'paginationDetails': {},
-                'schemas': {}
-            },
-            'data': None
-        }
-
-        assert res.status_code == 404
-        assert actual_body == expected_body
-        assert res.headers == {}
+    def test_ok_does_not_share_metadata_between_responses(self):
+        ok_metadata().error_details.append(ErrorDetail(description='description', location='some_field'))
+        assert orjson.loads(ok(_DATA).body)['meta']['errorDetails'] == []
 
-    def test_internal_error(self):
-        res = internal_error()
-
-        actual_body = jsonpickle.loads(res.body)
-        expected_body = {
-            'success': False,
-            'meta': {
-                'message': 'Request failed due to internal server error',
-                'errorDetails': [],
-                'paginationDetails': {},
-                'schemas': {}
-            },
-            'data': None
-        }
-
-        assert res.status_code == 500
-        assert actual_body == expected_body
-        assert res.headers == {}
+    def test_ok_with_object_data(self):
+        data = ErrorDetail(description='description', location='some_field')
+        res = ok(data)
 
+        actual_body = orjson.loads(res.body)
 
-class TestErrorHandler:
-    def test_ok_response(self):
-        @error_handler
-        def handler():
-            return ok({'test_data': 5})
+        assert res.status_code == 200
+        assert actual_body['data'] == {'description': 'description', 'location': 'some_field'}
+
+    @pytest.mark.parametrize('data,expected_data', [
+        ({'values': {1}}, {'values': [1]}),
+        ({'values': frozenset({1})}, {'values': [1]}),
+        ({'value': Decimal('1.10')}, {'value': '1.10'}),
+        ({'value': b'binary'}, {'value': 'YmluYXJ5'})
+    ], ids=['set', 'frozenset', 'decimal', 'bytes'])
+    def test_ok_with_non_native_data(self, data, expected_data):
+        res = ok(data)
+        assert orjson.loads(res.body)['data'] == expected_data
 
-        handler_response = handler()
-        assert not None
-        assert isinstance(handler_response, Response)
-        assert handler_response.status_code == 200
 
-    def test_not_found_response(self):
-        @error_handler
-        def handler():
-            raise ResourceNotFoundError('123')
+@error_handler
+def _ok_handler():
+    return ok({'test_data': 5})
 
-        handler_response = handler()
-        assert not None
-        assert isinstance(handler_response, Response)
-        assert handler_response.status_code == 404
 
-    def test_internal_server_error_response(self):
-        @error_handler
-        def handler():
-            raise Exception()
+@error_handler
+def _not_found_handler():
+    raise ResourceNotFoundError('123')
 
+
+class _CustomNotFoundError(ResourceNotFoundError):
+    pass
+
+
+@error_handler
+def _custom_not_found_handler():
+    raise _CustomNotFoundError('123')
+
+
+@error_handler
+def _bad_handler():
+    raise FormValidationError(errors=[{'loc': ['name'], 'msg': 'message'}])
+
+
+@error_handler
+def _internal_error_handler():
+    raise Exception()
+
+
+class TestErrorHandler:
+    @pytest.mark.parametrize('handler,status_code', [
+        (_ok_handler, 200),
+        (_not_found_handler, 404),
+        (_custom_not_found_handler, 404),
+        (_bad_handler, 400),
+        (_internal_error_handler, 500)
+    ], ids=['ok', 'not_found', 'not_found_for_error_subclass', 'bad', 'internal_server_error'])
+    def test_response(self, handler, status_code: int):
         handler_response = handler()
-        assert not None
         assert isinstance(handler_response, Response)
-        assert handler_response.status_code == 500
+        assert handler_response.status_code == status_code
+
+    def test_preserves_decorated_function_name(self):
+        assert _ok_handler.__name__ == '_ok_handler'
 
     def test_build_error_details(self):
         errors = [
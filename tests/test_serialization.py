@@ -1,6 +1,12 @@
+import copy
+import pickle
 import re
 
-from pyocle.serialization import CamelCaseAttributesMixin
+import pytest
+
+from pyocle.serialization import CamelCaseAttributesMixin, snake_case_to_camel_case
+
+_CAMEL_RE = re.compile(r'[a-z]([A-Z0-9]*[a-z][a-z0-9]*[A-Z]|[a-z0-9]*[A-Z][A-Z0-9]*[a-z])[A-Za-z0-9]*')
 
 
 class DummyModel(CamelCaseAttributesMixin):
@@ -11,10 +17,49 @@ class DummyModel(CamelCaseAttributesMixin):
 
 def test_get_state_produces_dictionary_with_camel_cased_keys():
     dummy = DummyModel('first', 'last')
-    assert not all([_is_camel_case(attribute_names) for attribute_names in dir(dummy)])
+    assert not all(_is_camel_case(attribute_names) for attribute_names in dir(dummy))
 
     state = dummy.__getstate__()
-    assert all([_is_camel_case(key) for key in state.keys()])
+    assert all(_is_camel_case(key) for key in state.keys())
+
+
+def test_get_state_caches_camel_cased_keys_per_class():
+    DummyModel('first', 'last').__getstate__()
+    assert DummyModel._camel_case_keys == {'first_name': 'firstName', 'last_name': 'lastName'}
+
+
+def test_get_state_of_slotted_model_uses_camel_cased_slots():
+    assert SlottedDummyModel._camel_case_slots == (('first_name', 'firstName'), ('last_name', 'lastName'))
+    assert SlottedDummyModel('first', 'last').__getstate__() == {'firstName': 'first', 'lastName': 'last'}
+
+
+class SlottedDummyModel(CamelCaseAttributesMixin):
+    __slots__ = ('first_name', 'last_name')
+
+    def __init__(self, first_name: str, last_name: str):
+        self.first_name = first_name
+        self.last_name = last_name
+
+
+@pytest.mark.parametrize('model_type', [DummyModel, SlottedDummyModel])
+@pytest.mark.parametrize('duplicate', [copy.copy, copy.deepcopy, lambda model: pickle.loads(pickle.dumps(model))],
+                         ids=['copy', 'deepcopy', 'pickle'])
+def test_set_state_restores_attributes_from_camel_cased_state(model_type, duplicate):
+    model = duplicate(model_type('first', 'last'))
+    assert (model.first_name, model.last_name) == ('first', 'last')
+
+
+@pytest.mark.parametrize('value,expected', [
+    ('name', 'name'),
+    ('first_name', 'firstName'),
+    ('error_details_list', 'errorDetailsList'),
+    ('double__underscore', 'double_Underscore'),
+    ('address_line_1', 'addressLine_1'),
+    ('name_', 'name_'),
+    ('_private', 'Private')
+])
+def test_snake_case_to_camel_case(value: str, expected: str):
+    assert snake_case_to_camel_case(value) == expected
 
 
 def _is_camel_case(string: str) -> bool:
@@ -29,5 +74,4 @@ def _is_camel_case(string: str) -> bool:
     :param string: The string value to check if camel cased
     :return: Whether the given string was camel cased or not
     """
-    pattern = re.compile(r'[a-z]([A-Z0-9]*[a-z][a-z0-9]*[A-Z]|[a-z0-9]*[A-Z][A-Z0-9]*[a-z])[A-Za-z0-9]*')
-    return re.match(pattern=pattern, string=string) is not None
+    return _CAMEL_RE.match(string) is not None